@@ -1,18 +1,26 @@
 import sys
-from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QLineEdit
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
-import vision_controller
+# cv2 e mediapipe são importados em segundo plano pelo SessionManager, depois que o menu abre
+from session_manager import SessionManager
 
 class FitVisionApp(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FitVision")
-        self.setGeometry(100, 100, 350, 300)
+        self.setGeometry(100, 100, 350, 380)
 
         self.setup_ui()
         self.apply_stylesheet()
 
+        # Câmera e modelo de pose são preparados enquanto o menu está na tela
+        self.session_manager = SessionManager()
+        QTimer.singleShot(0, self.session_manager.warm_up)
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self.update_status)
+        self.status_timer.start(200)
+
     def setup_ui(self):
         """Configura os widgets da interface."""
         # Layout principal
@@ -27,6 +35,14 @@ class FitVisionApp(QWidget):
         title_label.setObjectName("TitleLabel")
         layout.addWidget(title_label)
 
+        # --- Usuário (as sessões ficam no histórico de cada um) ---
+        self.user_label = QLabel("Usuário:")
+        layout.addWidget(self.user_label)
+
+        self.user_edit = QLineEdit()
+        self.user_edit.setPlaceholderText("default")
+        layout.addWidget(self.user_edit)
+
         # --- Seleção de Exercício ---
         self.exercise_label = QLabel("Escolha o Exercício:")
         layout.addWidget(self.exercise_label)
@@ -46,6 +62,11 @@ class FitVisionApp(QWidget):
 
         # Espaçador
         layout.addStretch()
+
+        # --- Estado da preparação da câmera e do modelo ---
+        self.status_label = QLabel("Preparando câmera e modelo...")
+        self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(self.status_label)
         
         # --- Layout para os botões ---
         button_layout = QHBoxLayout()
@@ -78,7 +99,7 @@ class FitVisionApp(QWidget):
             QLabel {
                 color: #E5E9F0;
             }
-            QComboBox {
+            QComboBox, QLineEdit {
                 border: 1px solid #4C566A;
                 border-radius: 5px;
                 padding: 8px;
@@ -116,17 +137,46 @@ class FitVisionApp(QWidget):
         self.quit_button.setObjectName("QuitButton")
 
 
+    def update_status(self):
+        """Mostra quando a câmera e o modelo terminaram de carregar."""
+        if not self.session_manager.ready:
+            return
+        self.status_timer.stop()
+        if self.session_manager.error is not None:
+            self.status_label.setText("Erro ao preparar a câmera.")
+        else:
+            self.status_label.setText(f"Pronto ({self.session_manager.warmup_seconds:.1f} s)")
+
     def start_session(self):
-        """Obtém os valores selecionados, esconde a GUI e inicia a câmera."""
+        """Obtém os valores selecionados, esconde a GUI e inicia a sessão com a câmera já aberta."""
         selected_exercise = self.exercise_combo.currentText()
         selected_level = self.level_combo.currentText()
+        user = self.user_edit.text().strip() or "default"
         
-        print(f"Configuração selecionada: Exercício={selected_exercise}, Nível={selected_level}")
+        print(f"Configuração selecionada: Usuário={user}, Exercício={selected_exercise}, Nível={selected_level}")
         
         self.hide()
-        vision_controller.start_exercise_session(selected_exercise, selected_level)
+        stats = self.session_manager.run_session(selected_exercise, selected_level, user=user)
+        if stats and stats.get("time_to_first_frame_ms") is not None:
+            print(f"Tempo até o primeiro frame: {stats['time_to_first_frame_ms']:.0f} ms")
+        self.show_history(user, selected_exercise)
         self.show()
 
+    def show_history(self, user, exercise_name):
+        """Mostra no menu os totais do usuário no exercício (consulta indexada no histórico)."""
+        history = self.session_manager.history
+        if history is None:
+            return
+        # A sessão que acabou de terminar ainda pode estar na fila da thread de escrita
+        history.flush(timeout=1.0)
+        summary = history.summary(user, exercise_name)
+        self.status_label.setText(f"{user}: {summary['sessions']} sessões, {summary['reps']} repetições de {exercise_name}")
+
+    def closeEvent(self, event):
+        """Libera a câmera e o modelo ao fechar o menu."""
+        self.session_manager.close()
+        super().closeEvent(event)
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = FitVisionApp()
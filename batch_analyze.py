@@ -0,0 +1,181 @@
+"""
+Análise em lote (sem interface) de vídeos gravados.
+
+Exemplo:
+    python batch_analyze.py videos/*.mp4 --exercise squat --level medium --output-dir resultados
+
+Cada vídeo é processado por um worker de um pool de processos, com uma instância
+de MediaPipe Pose por worker. Para cada arquivo é gerado um JSONL com os eventos
+de repetição, erros e feedback, usando a mesma lógica de Squat/BicepCurl/JumpingJack
+da sessão ao vivo.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+import mediapipe as mp
+
+from exercises import get_exercise_instance, level_thresholds
+from roi_tracker import RoiPoseEstimator
+from landmark_recording import LandmarkRecorder
+from vision_controller import analyze_pose
+
+# Instância de Pose do worker (criada uma vez por processo em _init_worker)
+_pose = None
+
+
+def _init_worker(min_detection_confidence, min_tracking_confidence):
+    global _pose
+    # Evita que cada worker abra várias threads do OpenCV e dispute os núcleos
+    cv2.setNumThreads(1)
+    _pose = mp.solutions.pose.Pose(
+        min_detection_confidence=min_detection_confidence,
+        min_tracking_confidence=min_tracking_confidence,
+    )
+
+
+def analyze_video(video_path, exercise_name, level, output_path, mirror=True, record=False):
+    """
+    Processa um vídeo inteiro e grava os eventos em `output_path` (JSONL).
+    Com record=True grava também os landmarks em um .fvlm ao lado do JSONL, para
+    reavaliações futuras com replay.py sem rodar o MediaPipe de novo.
+    Retorna um resumo com número de frames, repetições e tempo de processamento.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return {"file": video_path, "error": "Não foi possível abrir o vídeo."}
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    # O Pose do worker é reaproveitado entre vídeos: sem o reset, o rastreamento e a
+    # suavização dos landmarks do último frame do vídeo anterior entrariam neste, e o
+    # resultado dependeria da ordem em que os arquivos chegaram ao worker
+    _pose.reset()
+    exercise = get_exercise_instance(exercise_name, level)
+    estimator = RoiPoseEstimator(_pose, mirror=mirror)
+    recorder = LandmarkRecorder(os.path.splitext(output_path)[0] + ".fvlm") if record else None
+    frames = 0
+    last_errors = []
+    last_feedback = ""
+    last_reps = 0
+    total_reps = 0
+    started_at = time.perf_counter()
+
+    with open(output_path, "w", encoding="utf-8") as out:
+        def emit(event_type, frame_index, timestamp, **fields):
+            event = {"type": event_type, "frame": frame_index, "t": round(timestamp, 3)}
+            event.update(fields)
+            out.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            timestamp = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 or frames / fps
+            # Landmarks espelhados como na sessão ao vivo, para que "esquerda/direita" coincidam
+            landmark_array = estimator.process(frame)
+            if recorder is not None:
+                recorder.write(timestamp, landmark_array)
+
+            _, _, general_errors = analyze_pose(exercise, landmark_array, timestamp)
+
+            if exercise.reps > last_reps:
+                total_reps += 1
+                emit("rep", frames, timestamp, reps=exercise.reps, metrics=exercise.last_rep)
+            last_reps = exercise.reps
+            all_errors = general_errors + exercise.errors
+            if all_errors != last_errors:
+                emit("errors", frames, timestamp, errors=all_errors)
+                last_errors = all_errors
+            if exercise.feedback != last_feedback:
+                emit("feedback", frames, timestamp, feedback=exercise.feedback)
+                last_feedback = exercise.feedback
+            frames += 1
+
+        elapsed = time.perf_counter() - started_at
+        summary = {
+            "file": video_path,
+            "exercise": exercise_name,
+            "level": level,
+            "frames": frames,
+            # A contagem do exercício volta a zero quando a pessoa sai do quadro
+            "reps": total_reps,
+            "video_seconds": round(frames / fps, 3),
+            "processing_seconds": round(elapsed, 3),
+            "fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+        emit("summary", frames, frames / fps, **{k: v for k, v in summary.items() if k != "file"})
+
+    cap.release()
+    if recorder is not None:
+        recorder.close()
+    summary["output"] = output_path
+    return summary
+
+
+def _output_path_for(video_path, output_dir):
+    name = os.path.splitext(os.path.basename(video_path))[0]
+    return os.path.join(output_dir, f"{name}.jsonl")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise em lote de vídeos do FitVision (sem interface).")
+    parser.add_argument("videos", nargs="+", help="Arquivos de vídeo a analisar.")
+    parser.add_argument("--exercise", required=True, choices=sorted(level_thresholds))
+    parser.add_argument("--level", required=True, choices=["beginner", "medium", "advanced"])
+    parser.add_argument("--output-dir", default="batch_results", help="Diretório dos arquivos JSONL.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Número de processos.")
+    parser.add_argument("--no-mirror", action="store_true", help="Não espelha os frames (a sessão ao vivo espelha).")
+    parser.add_argument("--record", action="store_true", help="Grava também os landmarks (.fvlm) de cada vídeo.")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.6)
+    parser.add_argument("--min-tracking-confidence", type=float, default=0.7)
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    workers = max(1, min(args.workers, len(args.videos)))
+    started_at = time.perf_counter()
+    total_frames = 0
+    failures = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(args.min_detection_confidence, args.min_tracking_confidence),
+    ) as executor:
+        futures = {
+            executor.submit(
+                analyze_video, path, args.exercise, args.level,
+                _output_path_for(path, args.output_dir), not args.no_mirror, args.record,
+            ): path
+            for path in args.videos
+        }
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+            except Exception as e:
+                summary = {"file": futures[future], "error": str(e)}
+            if "error" in summary:
+                failures += 1
+                print(f"Erro em {summary['file']}: {summary['error']}")
+                continue
+            total_frames += summary["frames"]
+            print(f"{summary['file']}: {summary['reps']} reps, {summary['frames']} frames, {summary['fps']} FPS")
+
+    elapsed = time.perf_counter() - started_at
+    fps = total_frames / elapsed if elapsed > 0 else 0.0
+    print(json.dumps({
+        "files": len(args.videos),
+        "failures": failures,
+        "workers": workers,
+        "frames": total_frames,
+        "seconds": round(elapsed, 3),
+        "fps": round(fps, 2),
+        "fps_per_core": round(fps / workers, 2),
+    }))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
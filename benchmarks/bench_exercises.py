@@ -0,0 +1,152 @@
+"""
+Tier 1: reproduz as trajetórias sintéticas em Squat/BicepCurl/JumpingJack e mede
+o custo da lógica dos exercícios (ns/frame e memória alocada por frame), além do custo
+por frame de ler os landmarks e calcular os ângulos: listas por landmark + calculate_angle
+(como antes) x array (33, 4) + calculate_angles. Os dois caminhos partem do mesmo
+NormalizedLandmarkList do MediaPipe e pagam, dentro do tempo medido, a própria montagem
+dos dados.
+
+    python -m benchmarks.bench_exercises
+"""
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks import synthetic
+from exercises import get_exercise_instance, level_thresholds
+from utils import calculate_angle, calculate_angles, gate_landmarks, landmarks_to_array
+
+LEVELS = ["beginner", "medium", "advanced"]
+
+
+def bench_exercise(exercise_name, level, frames, repeat=5):
+    """Retorna ns/frame (melhor de `repeat` passadas), repetições contadas e alocações."""
+    best = None
+    reps = 0
+    for _ in range(repeat):
+        exercise = get_exercise_instance(exercise_name, level)
+        started_at = time.perf_counter_ns()
+        for frame in frames:
+            exercise.process_landmarks(frame)
+        elapsed = time.perf_counter_ns() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+        reps = exercise.reps
+
+    # Passada separada com tracemalloc: pico de memória transitória por frame
+    exercise = get_exercise_instance(exercise_name, level)
+    tracemalloc.start()
+    peak_total = 0
+    current_before, _ = tracemalloc.get_traced_memory()
+    for frame in frames:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        exercise.process_landmarks(frame)
+        _, peak = tracemalloc.get_traced_memory()
+        peak_total += peak - base
+    current_after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "exercise": exercise_name,
+        "level": level,
+        "frames": len(frames),
+        "reps": reps,
+        "ns_per_frame": best / len(frames),
+        "alloc_peak_bytes_per_frame": peak_total / len(frames),
+        "retained_bytes": current_after - current_before,
+    }
+
+
+def _landmark_lists(frames):
+    """Converte os frames sintéticos no formato que o MediaPipe entrega (NormalizedLandmarkList)."""
+    from mediapipe.framework.formats import landmark_pb2
+
+    lists = []
+    for frame in frames:
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z, visibility in frame.tolist():
+            landmark_list.landmark.add(x=x, y=y, z=z, visibility=visibility)
+        lists.append(landmark_list)
+    return lists
+
+
+def _legacy_frame(landmark_list):
+    """O que cada frame fazia antes: lista de y para o enquadramento, uma lista por landmark e calculate_angle."""
+    landmarks = landmark_list.landmark
+    y_coords = [landmark.y for landmark in landmarks]
+    max(y_coords) - min(y_coords)
+    hip = [landmarks[23].x, landmarks[23].y]
+    knee = [landmarks[25].x, landmarks[25].y]
+    ankle = [landmarks[27].x, landmarks[27].y]
+    shoulder = [landmarks[11].x, landmarks[11].y]
+    foot_index = [landmarks[31].x, landmarks[31].y]
+    calculate_angle(hip, knee, ankle)
+    calculate_angle(knee, hip, shoulder)
+    return foot_index
+
+
+def bench_angles(frames, repeat=5):
+    """
+    Custo por frame de ler os landmarks do agachamento e calcular seus ângulos, a partir
+    do resultado do MediaPipe: caminho antigo (listas + chamadas escalares) x caminho do
+    array (conversão única para (33, 4), enquadramento vetorizado e uma chamada vetorizada).
+    Mede também só os ângulos, sobre arrays já convertidos (a conversão acontece uma vez
+    por frame e serve a todo o resto do loop).
+    """
+    triplets = np.array([[23, 25, 27], [25, 23, 11]])
+    required = np.unique(triplets)
+    landmark_lists = _landmark_lists(frames)
+    out = np.empty((33, 4), dtype=np.float32)
+
+    def legacy():
+        for landmark_list in landmark_lists:
+            _legacy_frame(landmark_list)
+
+    def array_path():
+        for landmark_list in landmark_lists:
+            array = landmarks_to_array(landmark_list, out=out)
+            gate_landmarks(array, required, 0.6)
+            calculate_angles(array, triplets)
+
+    def scalar_angles():
+        # Mesmo partindo do array, o caminho escalar precisa montar as listas de pontos
+        for frame in frames:
+            for a, b, c in triplets:
+                calculate_angle(frame[a, :2].tolist(), frame[b, :2].tolist(), frame[c, :2].tolist())
+
+    def vector_angles():
+        for frame in frames:
+            calculate_angles(frame, triplets)
+
+    best = {}
+    for _ in range(repeat):
+        for name, fn in (("legacy", legacy), ("array", array_path), ("scalar", scalar_angles), ("vector", vector_angles)):
+            started_at = time.perf_counter_ns()
+            fn()
+            elapsed = time.perf_counter_ns() - started_at
+            best[name] = min(best.get(name, elapsed), elapsed)
+
+    return {
+        "angles_per_frame": len(triplets),
+        "legacy_frame_ns_per_frame": best["legacy"] / len(frames),
+        "array_frame_ns_per_frame": best["array"] / len(frames),
+        "calculate_angle_ns_per_frame": best["scalar"] / len(frames),
+        "calculate_angles_ns_per_frame": best["vector"] / len(frames),
+    }
+
+
+def run(n_reps=20, repeat=5):
+    results = {"exercises": [], "angles": None}
+    for exercise_name in level_thresholds:
+        frames, _ = synthetic.trajectory(exercise_name, n_reps=n_reps)
+        for level in LEVELS:
+            results["exercises"].append(bench_exercise(exercise_name, level, frames, repeat))
+    frames, _ = synthetic.trajectory("squat", n_reps=n_reps)
+    results["angles"] = bench_angles(frames, repeat)
+    return results
+
+
+if __name__ == "__main__":
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,105 @@
+"""
+Reavalia gravações sintéticas com oclusões para medir o efeito do filtro de visibilidade
+em analyze_pose: repetições falsas e custo de CPU com o filtro (MIN_LANDMARK_VISIBILITY)
+e sem ele (min_visibility=0).
+
+    python -m benchmarks.bench_gating --reps 20
+
+Cada gravação alterna repetições com pausas; no meio de cada pausa uma articulação usada
+pelo exercício fica encoberta por alguns frames: a visibilidade cai e a posição estimada
+se afasta da real e volta, como acontece com o MediaPipe quando algo passa na frente.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from benchmarks import synthetic
+from landmark_recording import LandmarkRecorder, load_recording
+from replay import replay
+from vision_controller import MIN_LANDMARK_VISIBILITY
+
+# Articulação encoberta em cada exercício (uma das que as regras leem)
+OCCLUDED_JOINT = {
+    "squat": synthetic.LEFT_KNEE,
+    "bicep_curl": synthetic.RIGHT_WRIST,
+    "jumping_jack": synthetic.LEFT_ELBOW,
+}
+FRAMES_PER_REP = {"squat": 45, "bicep_curl": 40, "jumping_jack": 30}
+
+
+def occluded_session(exercise_name, n_reps=20, rest_frames=60, occlusion_frames=30, seed=0):
+    """
+    Monta a sessão (repetição, pausa, repetição, ...) e retorna (frames limpos, frames com
+    oclusão). A oclusão fica no meio de cada pausa.
+    """
+    rng = np.random.default_rng(seed)
+    frames, _ = synthetic.trajectory(exercise_name, n_reps=n_reps, seed=seed)
+    per_rep = FRAMES_PER_REP[exercise_name]
+    joint = OCCLUDED_JOINT[exercise_name]
+    clean, occluded = [], []
+    bump = np.sin(np.linspace(0, np.pi, occlusion_frames))[:, None]
+    for rep in range(n_reps):
+        rep_frames = frames[rep * per_rep:(rep + 1) * per_rep]
+        rest = np.repeat(rep_frames[:1], rest_frames, axis=0)
+        noisy_rest = rest.copy()
+        start = (rest_frames - occlusion_frames) // 2
+        window = noisy_rest[start:start + occlusion_frames, joint]
+        direction = rng.normal(size=2)
+        direction /= np.linalg.norm(direction)
+        window[:, :2] += bump * direction * rng.uniform(0.12, 0.3) + rng.normal(0, 0.01, (occlusion_frames, 2))
+        window[:, 3] = rng.uniform(0.05, 0.4, occlusion_frames)
+        clean += [rep_frames, rest]
+        occluded += [rep_frames, noisy_rest]
+    return np.concatenate(clean), np.concatenate(occluded)
+
+
+def _write(path, frames):
+    with LandmarkRecorder(path) as recorder:
+        for i, landmarks in enumerate(frames):
+            recorder.write(i / synthetic.FPS, landmarks)
+    return load_recording(path)
+
+
+def _best_replay(recording, exercise_name, level, min_visibility, repeat):
+    results = [replay(recording, exercise_name, level, min_visibility=min_visibility) for _ in range(repeat)]
+    best = max(results, key=lambda r: r["fps"])
+    return {"reps": best["reps"], "us_per_frame": round(1e6 / best["fps"], 2)}
+
+
+def run(n_reps=20, level="medium", repeat=3, seed=0):
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for exercise_name in OCCLUDED_JOINT:
+            clean, occluded = occluded_session(exercise_name, n_reps, seed=seed)
+            clean_recording = _write(os.path.join(temp_dir, f"{exercise_name}_clean.fvlm"), clean)
+            recording = _write(os.path.join(temp_dir, f"{exercise_name}.fvlm"), occluded)
+            expected = replay(clean_recording, exercise_name, level)["reps"]
+            ungated = _best_replay(recording, exercise_name, level, 0.0, repeat)
+            gated = _best_replay(recording, exercise_name, level, MIN_LANDMARK_VISIBILITY, repeat)
+            skipped = int((occluded[:, OCCLUDED_JOINT[exercise_name], 3] < MIN_LANDMARK_VISIBILITY).sum())
+            results[exercise_name] = {
+                "frames": len(occluded),
+                "skipped_frames": skipped,
+                "expected_reps": expected,
+                "ungated": dict(ungated, false_reps=ungated["reps"] - expected),
+                "gated": dict(gated, false_reps=gated["reps"] - expected),
+                "cpu_saved": round(1.0 - gated["us_per_frame"] / ungated["us_per_frame"], 3),
+            }
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Repetições falsas e custo com e sem o filtro de visibilidade.")
+    parser.add_argument("--reps", type=int, default=20)
+    parser.add_argument("--level", default="medium", choices=["beginner", "medium", "advanced"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.reps, args.level, args.repeat, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
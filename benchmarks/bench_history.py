@@ -0,0 +1,128 @@
+"""
+Teste de carga do histórico: um loop de frames a 30 FPS (lógica do exercício sobre uma
+trajetória sintética) emite muitos eventos por frame, e o tempo de cada frame é comparado
+entre três versões: sem histórico, com o HistoryStore (fila + thread de escrita em lotes,
+WAL) e com a gravação ingênua dentro do loop (INSERT + COMMIT por evento).
+
+    python -m benchmarks.bench_history --frames 600 --events-per-frame 20
+
+O tempo medido é o do corpo do loop (sem a espera até o próximo frame); o resultado traz
+p50/p99/máximo por frame, eventos gravados e descartados e a vazão da thread de escrita.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import synthetic
+from exercises import get_exercise_instance
+from history_store import SCHEMA, HistoryStore
+
+ERROR_MESSAGES = ["Agache mais!", "Coluna reta! Peito aberto.", "Joelhos para tras!"]
+REP_EVENT = {
+    "rep": 1, "t": 0.0, "duration": 1.3, "eccentric_time": 0.7, "concentric_time": 0.6, "angle": "knee_angle",
+    "min_angle": 80.1, "max_angle": 174.6, "range_of_motion": 94.4, "peak_velocity": 211.8,
+    "mean_concentric_velocity": 157.4, "frames": 43, "error_frames": {"Coluna reta! Peito aberto.": 32},
+}
+
+
+class _SyncLog:
+    """Gravação ingênua: cada evento é um INSERT com COMMIT dentro do loop de frames."""
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.connection.execute("INSERT INTO sessions (id, user, exercise, level, started_at) VALUES ('s', 'bench', 'squat', 'medium', 0)")
+        self.connection.commit()
+
+    def rep(self, event, t):
+        self.connection.execute(
+            "INSERT INTO reps (session_id, rep, t, duration, range_of_motion, error_frames) VALUES ('s', ?, ?, ?, ?, ?)",
+            (event["rep"], t, event["duration"], event["range_of_motion"], json.dumps(event["error_frames"])),
+        )
+        self.connection.commit()
+
+    def errors(self, messages, t):
+        for message in messages:
+            self.connection.execute("INSERT INTO errors (session_id, t, message) VALUES ('s', ?, ?)", (t, message))
+            self.connection.commit()
+
+
+def _frame_loop(frames, fps, events_per_frame, session_log):
+    """Roda o loop e retorna os tempos do corpo de cada frame, em segundos."""
+    exercise = get_exercise_instance("squat", "medium")
+    period = 1.0 / fps if fps else 0.0
+    body_times = np.empty(len(frames))
+    next_frame = time.perf_counter()
+    for i, landmarks in enumerate(frames):
+        started_at = time.perf_counter()
+        exercise.process_landmarks(landmarks, started_at)
+        if session_log is not None:
+            t = i * period
+            for _ in range(events_per_frame - 1):
+                session_log.rep(REP_EVENT, t)
+            # Um erro diferente a cada frame: cada frame gera um evento de erro novo
+            session_log.errors([ERROR_MESSAGES[i % len(ERROR_MESSAGES)]], t)
+        finished_at = time.perf_counter()
+        body_times[i] = finished_at - started_at
+        if period:
+            next_frame += period
+            delay = next_frame - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return body_times
+
+
+def _summary(body_times):
+    us = body_times * 1e6
+    return {
+        "p50_us": round(float(np.percentile(us, 50)), 1),
+        "p99_us": round(float(np.percentile(us, 99)), 1),
+        "max_us": round(float(us.max()), 1),
+        "mean_us": round(float(us.mean()), 1),
+    }
+
+
+def run(frames=600, fps=30, events_per_frame=20):
+    trajectory, _ = synthetic.trajectory("squat", n_reps=max(1, frames // 45 + 1))
+    trajectory = trajectory[:frames]
+    results = {"frames": len(trajectory), "fps": fps, "events_per_frame": events_per_frame}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        results["none"] = _summary(_frame_loop(trajectory, fps, events_per_frame, None))
+
+        store = HistoryStore(os.path.join(temp_dir, "history.db"))
+        session_log = store.begin_session("bench", "squat", "medium")
+        started_at = time.perf_counter()
+        body_times = _frame_loop(trajectory, fps, events_per_frame, session_log)
+        store.flush()
+        elapsed = time.perf_counter() - started_at
+        with sqlite3.connect(store.path) as connection:
+            stored = sum(connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                         for table in ("sessions", "reps", "errors"))
+        store.close()
+        results["background"] = dict(
+            _summary(body_times), events_written=store.written, events_dropped=store.dropped,
+            rows_in_db=stored, batches=store.batches,
+            writer_events_per_s=round(store.written / elapsed, 1),
+        )
+
+        sync_log = _SyncLog(os.path.join(temp_dir, "sync.db"))
+        results["sync_in_loop"] = _summary(_frame_loop(trajectory, fps, events_per_frame, sync_log))
+        sync_log.connection.close()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do histórico de sessões.")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--fps", type=float, default=30, help="0 roda o loop sem espera entre frames.")
+    parser.add_argument("--events-per-frame", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.frames, args.fps, args.events_per_frame), indent=2))
+
+
+if __name__ == "__main__":
+    main()
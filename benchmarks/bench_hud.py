@@ -0,0 +1,68 @@
+"""
+Compara o custo por frame do desenho da interface: draw_hud (imediato) x HudCompositor.
+
+    python -m benchmarks.bench_hud --frames 500
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from hud import HudCompositor
+from vision_controller import DISPLAY_HEIGHT, DISPLAY_WIDTH, draw_hud
+
+
+def _scenario(frames):
+    """Sequência determinística de estados da interface (reps, feedback, erros)."""
+    errors_cycle = [[], ["Coluna reta! Peito aberto."], ["Coluna reta! Peito aberto.", "Joelhos para tras!"]]
+    for i in range(frames):
+        reps = i // 45
+        feedback = "Boa! Repeticao completa!" if (i // 15) % 3 == 0 else "Subindo..."
+        yield reps, feedback, errors_cycle[(i // 30) % 3]
+
+
+def run(frames=500, seed=0):
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 256, (DISPLAY_HEIGHT, DISPLAY_WIDTH, 3), dtype=np.uint8)
+    image = np.empty_like(background)
+    results = {}
+
+    # Antes: desenho imediato (cópia do frame inteiro a cada painel)
+    elapsed = 0.0
+    for reps, feedback, errors in _scenario(frames):
+        image[:] = background
+        started_at = time.perf_counter()
+        draw_hud(image, "squat", "medium", reps, feedback, errors)
+        elapsed += time.perf_counter() - started_at
+    reference = image.copy()
+    results["draw_hud_ms"] = elapsed / frames * 1000.0
+
+    # Depois: compositor com cache
+    hud = HudCompositor("squat", "medium", DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    elapsed = 0.0
+    for reps, feedback, errors in _scenario(frames):
+        image[:] = background
+        started_at = time.perf_counter()
+        hud.draw(image, reps, feedback, errors)
+        elapsed += time.perf_counter() - started_at
+    results["compositor_ms"] = elapsed / frames * 1000.0
+
+    results["speedup"] = results["draw_hud_ms"] / results["compositor_ms"] if results["compositor_ms"] else 0.0
+    # Diferença visual no último frame (arredondamento da mistura e do anti-aliasing)
+    diff = np.abs(image.astype(np.int16) - reference.astype(np.int16))
+    results["max_pixel_diff"] = int(diff.max())
+    results["mean_pixel_diff"] = float(diff.mean())
+    results["frames"] = frames
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do desenho da interface (HUD).")
+    parser.add_argument("--frames", type=int, default=500)
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.frames)))
+
+
+if __name__ == "__main__":
+    main()
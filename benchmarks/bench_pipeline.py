@@ -0,0 +1,72 @@
+"""
+Tier 2: gera um vídeo a partir de uma trajetória sintética (boneco desenhado com o
+OpenCV) e executa o caminho completo de start_exercise_session com a tela desativada.
+
+    python -m benchmarks.bench_pipeline --exercise squat --level medium
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import cv2
+import numpy as np
+
+from benchmarks import synthetic
+
+# Ligações do boneco: tronco, braços e pernas (índices do MediaPipe Pose)
+STICK_FIGURE = [
+    (11, 12), (11, 23), (12, 24), (23, 24),
+    (11, 13), (13, 15), (12, 14), (14, 16),
+    (23, 25), (25, 27), (24, 26), (26, 28), (27, 31), (28, 32),
+]
+
+
+def generate_video(path, exercise_name, n_reps=5, width=640, height=480):
+    """Grava um vídeo MJPG com o boneco da trajetória sintética e retorna o número de frames."""
+    frames, _ = synthetic.trajectory(exercise_name, n_reps=n_reps)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), synthetic.FPS, (width, height))
+    canvas = np.empty((height, width, 3), dtype=np.uint8)
+    for landmarks in frames:
+        canvas[:] = (90, 110, 120)
+        # O vídeo é gravado como a câmera veria (a sessão espelha de volta)
+        points = np.column_stack(((1.0 - landmarks[:, 0]) * width, landmarks[:, 1] * height)).astype(np.int32).tolist()
+        for a, b in STICK_FIGURE:
+            cv2.line(canvas, points[a], points[b], (40, 40, 200), 14, cv2.LINE_AA)
+        cv2.circle(canvas, points[0], 26, (60, 150, 220), -1, cv2.LINE_AA)
+        writer.write(canvas)
+    writer.release()
+    return len(frames)
+
+
+def run(exercise_name="squat", level="medium", n_reps=5, video=None, target_fps=None):
+    """Executa a sessão sobre o vídeo e retorna o resumo de desempenho do pipeline."""
+    # Importado aqui para que o tier 1 não dependa do MediaPipe
+    from vision_controller import start_exercise_session
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = video
+        frames = None
+        if path is None:
+            path = os.path.join(tmp, f"{exercise_name}.avi")
+            frames = generate_video(path, exercise_name, n_reps)
+        stats = start_exercise_session(exercise_name, level, source=path, display=False, target_fps=target_fps)
+    if stats is None:
+        return None
+    stats.update({"exercise": exercise_name, "level": level, "video_frames": frames})
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline completo sem tela.")
+    parser.add_argument("--exercise", default="squat", choices=sorted(synthetic.TRAJECTORIES))
+    parser.add_argument("--level", default="medium", choices=["beginner", "medium", "advanced"])
+    parser.add_argument("--reps", type=int, default=5)
+    parser.add_argument("--video", help="Usa um vídeo gravado em vez do vídeo sintético.")
+    parser.add_argument("--target-fps", type=float, default=None, help="Ativa o agendador adaptativo.")
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.exercise, args.level, args.reps, args.video, args.target_fps)))
+
+
+if __name__ == "__main__":
+    main()
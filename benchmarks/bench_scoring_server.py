@@ -0,0 +1,173 @@
+"""
+Gerador de carga para o scoring_server: abre milhares de sessões simultâneas que enviam
+trajetórias sintéticas e confere as repetições devolvidas com uma avaliação offline.
+
+    python -m benchmarks.bench_scoring_server --sessions 2000 --fps 10 --duration 20
+
+Por padrão o servidor é iniciado em um subprocesso (um núcleo); use --no-spawn para
+apontar para um servidor já em execução. O relatório traz frames/s pontuados, uso de
+CPU do servidor, memória por sessão e a latência das respostas (do envio do frame que
+mudou o estado até a chegada da resposta).
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.synthetic import trajectory
+from exercises import get_exercise_instance
+from landmark_recording import FLAG_PERSON, RECORD_DTYPE
+from scoring_server import RECORD_SIZE, raise_open_file_limit
+from vision_controller import analyze_pose
+
+EXERCISES = ("squat", "bicep_curl", "jumping_jack")
+
+
+def _workload(exercise_name, level, frames_needed):
+    """Registros binários da trajetória e as repetições esperadas após cada frame."""
+    n_reps = 2
+    while True:
+        frames, timestamps = trajectory(exercise_name, n_reps=n_reps)
+        if len(frames) >= frames_needed:
+            break
+        n_reps *= 2
+    records = np.zeros(len(frames), dtype=RECORD_DTYPE)
+    records["t"] = timestamps
+    records["flags"] = FLAG_PERSON
+    records["landmarks"] = frames
+    exercise = get_exercise_instance(exercise_name, level)
+    expected = np.empty(len(frames), dtype=np.int64)
+    for i, landmarks in enumerate(frames):
+        analyze_pose(exercise, landmarks)
+        expected[i] = exercise.reps
+    return records.tobytes(), expected
+
+
+async def _stats(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"stats": true}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def _client(host, port, exercise_name, level, payload, fps, batch, duration, start_delay, result):
+    """Uma sessão: envia `batch` frames a cada batch/fps segundos e lê as respostas."""
+    await asyncio.sleep(start_delay)
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({"exercise": exercise_name, "level": level}).encode() + b"\n")
+    await writer.drain()
+    hello = json.loads(await reader.readline())
+    if "session" not in hello:
+        result["error"] = hello.get("error")
+        writer.close()
+        return
+
+    sent_at = []  # instante de envio de cada lote
+    latencies = result["latencies"]
+
+    async def read_responses():
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            result["reps"] = message["reps"]
+            latencies.append(time.perf_counter() - sent_at[message["frame"] // batch])
+
+    reading = asyncio.create_task(read_responses())
+    interval = batch / fps
+    total_frames = min(int(duration * fps), len(payload) // RECORD_SIZE)
+    started_at = time.perf_counter()
+    sent = 0
+    while sent < total_frames:
+        count = min(batch, total_frames - sent)
+        sent_at.append(time.perf_counter())
+        writer.write(payload[sent * RECORD_SIZE:(sent + count) * RECORD_SIZE])
+        sent += count
+        await writer.drain()
+        await asyncio.sleep(max(0.0, started_at + len(sent_at) * interval - time.perf_counter()))
+    result["frames_sent"] = sent
+    writer.write_eof()
+    await reading
+    writer.close()
+
+
+async def _run(host, port, sessions, fps, batch, duration, level, ramp):
+    workloads = {name: _workload(name, level, int(duration * fps) + batch) for name in EXERCISES}
+    before = await _stats(host, port)
+    results = [{"reps": 0, "frames_sent": 0, "latencies": [], "error": None} for _ in range(sessions)]
+    started_at = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, EXERCISES[i % len(EXERCISES)], level, workloads[EXERCISES[i % len(EXERCISES)]][0],
+                fps, batch, duration, ramp * i / sessions, results[i])
+        for i in range(sessions)
+    ))
+    elapsed = time.perf_counter() - started_at
+    after = await _stats(host, port)
+
+    mismatches = errors = 0
+    for i, r in enumerate(results):
+        if r["error"]:
+            errors += 1
+            continue
+        expected = workloads[EXERCISES[i % len(EXERCISES)]][1]
+        if r["frames_sent"] and r["reps"] != expected[r["frames_sent"] - 1]:
+            mismatches += 1
+    latencies = np.array([l for r in results for l in r["latencies"]]) * 1000.0
+    frames = after["frames_scored"] - before["frames_scored"]
+    return {
+        "sessions": sessions,
+        "fps_per_session": fps,
+        "batch": batch,
+        "seconds": round(elapsed, 2),
+        "frames_scored": frames,
+        "frames_per_s": frames / elapsed,
+        "server_cpu_share": (after["cpu_s"] - before["cpu_s"]) / elapsed,
+        "server_cpu_us_per_frame": (after["cpu_s"] - before["cpu_s"]) / max(frames, 1) * 1e6,
+        "server_rss_kb_per_session": max(0, after["max_rss_kb"] - before["max_rss_kb"]) / sessions,
+        "latency_ms_p50": float(np.percentile(latencies, 50)) if len(latencies) else 0.0,
+        "latency_ms_p95": float(np.percentile(latencies, 95)) if len(latencies) else 0.0,
+        "rejected": errors,
+        "rep_mismatches": mismatches,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gerador de carga do scoring_server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--fps", type=float, default=10.0, help="Frames por segundo de cada sessão.")
+    parser.add_argument("--batch", type=int, default=5, help="Frames por envio.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Segundos de envio por sessão.")
+    parser.add_argument("--level", default="medium")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Segundos para abrir todas as sessões.")
+    parser.add_argument("--no-spawn", action="store_true", help="Usa um servidor já em execução.")
+    args = parser.parse_args(argv)
+
+    raise_open_file_limit()
+    server = None
+    if not args.no_spawn:
+        server = subprocess.Popen(
+            [sys.executable, "scoring_server.py", "--host", args.host, "--port", str(args.port),
+             "--max-sessions", str(args.sessions)],
+            stdout=subprocess.PIPE,
+        )
+        server.stdout.readline()  # aguarda o servidor anunciar que está ouvindo
+    try:
+        report = asyncio.run(_run(args.host, args.port, args.sessions, args.fps, args.batch,
+                                  args.duration, args.level, args.ramp))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
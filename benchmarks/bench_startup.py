@@ -0,0 +1,110 @@
+"""
+Mede o tempo de abertura: importações feitas antes do menu aparecer e o tempo até o
+primeiro frame de uma sessão, a frio (processo novo, câmera e Pose abertos na hora) e
+aquecido (SessionManager já preparado, trocando de exercício entre as sessões).
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --video treino.mp4
+
+Cada medida roda em um processo Python novo, para que nenhuma importação já esteja em cache.
+As sessões rodam sem histórico e sem ajuste automático de qualidade: o teste não grava
+sessões falsas em ~/.fitvision/history.db, não sobrescreve o perfil de qualidade da máquina
+com custos medidos no vídeo sintético, e o tempo a frio não inclui a medição da máquina.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+EXERCISES = ["squat", "bicep_curl", "jumping_jack"]
+
+
+def _child_imports(modules):
+    started_at = time.perf_counter()
+    for module in modules:
+        __import__(module)
+    return {"import_ms": (time.perf_counter() - started_at) * 1000.0}
+
+
+def _child_cold(video):
+    started_at = time.perf_counter()
+    import vision_controller
+    import_ms = (time.perf_counter() - started_at) * 1000.0
+    stats = vision_controller.start_exercise_session(
+        "squat", "medium", source=video, display=False, auto_quality=False, history=None,
+    )
+    return {"import_ms": import_ms, "ttff_ms": stats["time_to_first_frame_ms"],
+            "ttff_from_launch_ms": import_ms + stats["time_to_first_frame_ms"]}
+
+
+def _child_warm(video):
+    from session_manager import SessionManager
+
+    manager = SessionManager(source=video, auto_quality=False, history=False)
+    manager.warm_up()
+    manager.wait_ready()
+    ttff = [manager.run_session(name, "medium", display=False)["time_to_first_frame_ms"] for name in EXERCISES]
+    manager.close()
+    return {"warmup_s": manager.warmup_seconds, "ttff_ms": ttff}
+
+
+def _in_subprocess(*args):
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", *args],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(video=None, repeat=3):
+    temp_dir = None
+    if video is None:
+        from benchmarks.bench_pipeline import generate_video
+        temp_dir = tempfile.TemporaryDirectory()
+        video = os.path.join(temp_dir.name, "startup.avi")
+        generate_video(video, "squat", n_reps=1)
+    try:
+        menu_old = [_in_subprocess("imports", "vision_controller", "mediapipe")["import_ms"] for _ in range(repeat)]
+        menu_new = [_in_subprocess("imports", "session_manager")["import_ms"] for _ in range(repeat)]
+        cold = [_in_subprocess("cold", video) for _ in range(repeat)]
+        warm = [_in_subprocess("warm", video) for _ in range(repeat)]
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    return {
+        # Antes o menu importava vision_controller, que importava cv2 e mediapipe
+        "menu_imports_ms_before": min(menu_old),
+        "menu_imports_ms": min(menu_new),
+        "cold_ttff_ms": min(c["ttff_ms"] for c in cold),
+        "cold_ttff_from_launch_ms": min(c["ttff_from_launch_ms"] for c in cold),
+        "warmup_s": min(w["warmup_s"] for w in warm),
+        "warm_ttff_ms": min(min(w["ttff_ms"]) for w in warm),
+        "warm_ttff_ms_per_exercise": dict(zip(EXERCISES, (min(t) for t in zip(*(w["ttff_ms"] for w in warm))))),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de abertura e até o primeiro frame.")
+    parser.add_argument("--video", default=None, help="Vídeo usado como fonte (padrão: vídeo sintético).")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        kind, *rest = args.child
+        if kind == "imports":
+            result = _child_imports(rest)
+        elif kind == "cold":
+            result = _child_cold(rest[0])
+        else:
+            result = _child_warm(rest[0])
+        print(json.dumps(result))
+        return
+    print(json.dumps(run(args.video, args.repeat), indent=2))
+
+
+if __name__ == "__main__":
+    main()
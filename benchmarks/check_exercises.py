@@ -0,0 +1,119 @@
+"""
+Teste de regressão da lógica dos exercícios: reproduz as trajetórias sintéticas em todos
+os exercícios e níveis e compara, frame a frame, repetições, estágio, feedback e erros com
+os valores fixados em exercises_golden.json.
+
+    python -m benchmarks.check_exercises
+    python -m benchmarks.check_exercises --update   # grava novos valores de referência
+
+Cada exercício roda sobre três sessões: a trajetória limpa, a mesma com ruído nas
+coordenadas e uma com ruído e quadros sem pessoa de tempos em tempos (reset). Também
+confere que o motor de vários níveis (get_multi_level_engine) dá, em cada coluna, o
+mesmo resultado da instância de um nível. Sai com código 1 se algo divergir.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+from benchmarks import synthetic
+from exercises import get_exercise_instance, get_multi_level_engine, level_thresholds
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "exercises_golden.json")
+# Quadros sem pessoa na sessão com resets: um a cada RESET_EVERY frames
+RESET_EVERY = 173
+
+
+def sessions(exercise_name, n_reps=12, seed=0):
+    """Sessões sintéticas do exercício: {nome: lista de frames (None = ninguém no quadro)}."""
+    clean, _ = synthetic.trajectory(exercise_name, n_reps=n_reps, seed=seed)
+    rng = np.random.default_rng(seed)
+    noisy = clean.copy()
+    noisy[:, :, :2] += rng.normal(0, 0.01, noisy[:, :, :2].shape).astype(np.float32)
+    with_resets = [None if i % RESET_EVERY == RESET_EVERY - 1 else frame for i, frame in enumerate(noisy)]
+    return {"clean": list(clean), "noisy": list(noisy), "resets": with_resets}
+
+
+def trace(exercise_name, level, frames):
+    """Estado depois de cada frame: (repetições, estágio, feedback, erros)."""
+    exercise = get_exercise_instance(exercise_name, level)
+    states = []
+    for landmarks in frames:
+        if landmarks is None:
+            exercise.reset()
+        else:
+            exercise.process_landmarks(landmarks, 0.0)
+        states.append((exercise.reps, exercise.stage, exercise.feedback, list(exercise.errors)))
+    return states
+
+
+def multi_level_mismatches(exercise_name, frames, traces):
+    """Frames em que alguma coluna do motor de vários níveis diverge da instância de um nível."""
+    engine = get_multi_level_engine(exercise_name)
+    mismatches = 0
+    for i, landmarks in enumerate(frames):
+        if landmarks is None:
+            engine.reset()
+        else:
+            engine.process_landmarks(landmarks)
+        for level, state in engine.summary().items():
+            reps, stage, feedback, errors = traces[level][i]
+            if (state["reps"], state["stage"], state["feedback"], state["errors"]) != (reps, stage, feedback, errors):
+                mismatches += 1
+    return mismatches
+
+
+def _pin(states):
+    reps, stage, feedback, _ = states[-1]
+    digest = hashlib.sha1(json.dumps(states, ensure_ascii=False).encode("utf-8")).hexdigest()
+    return {"frames": len(states), "reps": reps, "stage": stage, "feedback": feedback, "trace_sha1": digest}
+
+
+def run():
+    """Retorna ({exercício: {sessão: {nível: valores fixados}}}, divergências do motor de vários níveis)."""
+    results = {}
+    multi_level = {}
+    for exercise_name in level_thresholds:
+        results[exercise_name] = {}
+        for session_name, frames in sessions(exercise_name).items():
+            traces = {level: trace(exercise_name, level, frames) for level in level_thresholds[exercise_name]}
+            results[exercise_name][session_name] = {level: _pin(states) for level, states in traces.items()}
+            multi_level[f"{exercise_name}/{session_name}"] = multi_level_mismatches(exercise_name, frames, traces)
+    return results, multi_level
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regressão da lógica dos exercícios sobre trajetórias sintéticas.")
+    parser.add_argument("--update", action="store_true", help="Grava os valores atuais como referência.")
+    args = parser.parse_args(argv)
+
+    results, multi_level = run()
+    failures = [f"{key}: {count} frames divergentes no motor de vários níveis"
+                for key, count in multi_level.items() if count]
+    if args.update:
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Referência gravada em {GOLDEN_PATH}")
+    else:
+        with open(GOLDEN_PATH, encoding="utf-8") as f:
+            golden = json.load(f)
+        for exercise_name, by_session in golden.items():
+            for session_name, by_level in by_session.items():
+                for level, expected in by_level.items():
+                    actual = results.get(exercise_name, {}).get(session_name, {}).get(level)
+                    if actual != expected:
+                        failures.append(f"{exercise_name}/{session_name}/{level}: esperado {expected}, obtido {actual}")
+    for failure in failures:
+        print(failure)
+    if failures:
+        sys.exit(1)
+    checked = sum(len(by_level) for by_session in results.values() for by_level in by_session.values())
+    print(f"OK: {checked} sessões conferidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Executa a suíte de benchmarks e grava o resultado em JSON para comparação entre versões.
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output novo.json --compare bench.json
+
+Tier 1 (sempre): lógica dos exercícios sobre trajetórias sintéticas (não precisa de câmera).
+Tier 2 (--pipeline): caminho completo de start_exercise_session sobre um vídeo gerado,
+com a tela desativada. O boneco sintético não é detectado como pessoa pelo MediaPipe,
+então esse tier mede o custo do caminho do frame; use --video para um vídeo real.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import bench_exercises
+
+# Piora relativa tolerada antes de acusar regressão (todas as métricas comparadas são "menor é melhor")
+REGRESSION_TOLERANCE = 0.10
+
+
+def _metadata():
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=False,
+        ).stdout.strip() or None
+    except OSError:
+        revision = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def _flatten(results):
+    """Achata o resultado em {nome_da_métrica: valor} para a comparação."""
+    metrics = {}
+    for entry in results.get("exercises", []):
+        key = f"{entry['exercise']}/{entry['level']}"
+        metrics[f"{key}/ns_per_frame"] = entry["ns_per_frame"]
+        metrics[f"{key}/alloc_peak_bytes_per_frame"] = entry["alloc_peak_bytes_per_frame"]
+    for name, value in (results.get("angles") or {}).items():
+        if name.endswith("ns_per_frame"):
+            metrics[f"angles/{name}"] = value
+    pipeline = results.get("pipeline") or {}
+    for name in ("latency_ms_mean", "latency_ms_p95"):
+        if name in pipeline:
+            metrics[f"pipeline/{name}"] = pipeline[name]
+    return metrics
+
+
+def compare(current, baseline, tolerance=REGRESSION_TOLERANCE):
+    """Retorna a lista de regressões (métricas que pioraram mais que a tolerância)."""
+    regressions = []
+    old_metrics = _flatten(baseline)
+    for name, value in _flatten(current).items():
+        old = old_metrics.get(name)
+        if not old:
+            continue
+        ratio = value / old
+        if ratio > 1.0 + tolerance:
+            regressions.append({"metric": name, "baseline": old, "current": value, "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks do FitVision.")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+    parser.add_argument("--compare", help="JSON de uma execução anterior para detectar regressões.")
+    parser.add_argument("--reps", type=int, default=20, help="Repetições por trajetória sintética.")
+    parser.add_argument("--repeat", type=int, default=5, help="Passadas por medida (vale a melhor).")
+    parser.add_argument("--pipeline", action="store_true", help="Inclui o tier 2 (MediaPipe + OpenCV).")
+    parser.add_argument("--video", help="Vídeo real para o tier 2.")
+    args = parser.parse_args(argv)
+
+    results = {"meta": _metadata()}
+    results.update(bench_exercises.run(n_reps=args.reps, repeat=args.repeat))
+    if args.pipeline or args.video:
+        from benchmarks import bench_pipeline
+        results["pipeline"] = bench_pipeline.run(video=args.video)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline)
+        for regression in regressions:
+            print(
+                f"REGRESSÃO {regression['metric']}: {regression['baseline']:.1f} -> "
+                f"{regression['current']:.1f} ({regression['ratio']:.2f}x)",
+                file=sys.stderr,
+            )
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,128 @@
+"""
+Trajetórias sintéticas e determinísticas de landmarks (arrays (N, 33, 4) float32)
+para agachamento, rosca bíceps e polichinelo.
+
+Cada trajetória alterna repetições completas (que contam em todos os níveis) com
+repetições parciais (que só contam nos níveis mais fáceis), para exercitar todos os
+ramos da lógica de Squat/BicepCurl/JumpingJack.
+"""
+import numpy as np
+
+FPS = 30
+
+# Índices dos landmarks do MediaPipe Pose usados na montagem do corpo
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_ELBOW, RIGHT_ELBOW = 13, 14
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+LEFT_KNEE, RIGHT_KNEE = 25, 26
+LEFT_ANKLE, RIGHT_ANKLE = 27, 28
+LEFT_HEEL, RIGHT_HEEL = 29, 30
+LEFT_FOOT_INDEX, RIGHT_FOOT_INDEX = 31, 32
+
+
+def _direction(angle_deg):
+    radians = np.radians(angle_deg)
+    return np.array([np.cos(radians), np.sin(radians)])
+
+
+def _fill_body(frame, shoulder, elbow, wrist, hip, knee, ankle, foot_index, side_offset):
+    """Preenche os 33 landmarks a partir de um lado do corpo (o outro é deslocado em x)."""
+    left = {
+        LEFT_SHOULDER: shoulder, LEFT_ELBOW: elbow, LEFT_WRIST: wrist, LEFT_HIP: hip,
+        LEFT_KNEE: knee, LEFT_ANKLE: ankle, LEFT_HEEL: ankle + (-0.02, 0.01), LEFT_FOOT_INDEX: foot_index,
+    }
+    for index, point in left.items():
+        frame[index, :2] = point
+        frame[index + 1, :2] = point + (side_offset, 0.0)
+    # Cabeça (0-10) acima dos ombros e mãos (17-22) junto aos punhos
+    head = (frame[LEFT_SHOULDER, :2] + frame[RIGHT_SHOULDER, :2]) / 2 + (0.0, -0.12)
+    frame[0:11, :2] = head
+    frame[17:23:2, :2] = frame[LEFT_WRIST, :2] + (0.0, 0.02)
+    frame[18:23:2, :2] = frame[RIGHT_WRIST, :2] + (0.0, 0.02)
+    frame[:, 3] = 0.99
+
+
+def _cycle(n_reps, peaks, frames_per_rep):
+    """Curva 0 -> pico -> 0 por repetição; `peaks` é percorrido ciclicamente."""
+    phase = 0.5 - 0.5 * np.cos(np.linspace(0, 2 * np.pi, frames_per_rep, endpoint=False))
+    return np.concatenate([phase * peaks[i % len(peaks)] for i in range(n_reps)])
+
+
+def squat(n_reps=20, frames_per_rep=45, seed=0):
+    """Agachamento visto de lado: o ângulo do joelho vai de 175° até 80° (completo) ou 125° (parcial)."""
+    rng = np.random.default_rng(seed)
+    depth = _cycle(n_reps, [95.0, 50.0], frames_per_rep)
+    frames = np.zeros((len(depth), 33, 4), dtype=np.float32)
+    for i, d in enumerate(depth):
+        knee_angle = 175.0 - d
+        shin_tilt = d * 0.05
+        ankle = np.array([0.5, 0.9])
+        knee = ankle + 0.2 * _direction(-90.0 + shin_tilt)
+        shin_down = np.degrees(np.arctan2(*(ankle - knee)[::-1]))
+        hip = knee + 0.2 * _direction(shin_down + knee_angle)
+        shoulder = hip + 0.3 * _direction(-90.0 + d * 0.4)
+        elbow = shoulder + 0.12 * _direction(-10.0 + d * 0.2)
+        wrist = elbow + 0.12 * _direction(0.0)
+        _fill_body(frames[i], shoulder, elbow, wrist, hip, knee, ankle, ankle + (0.08, 0.0), 0.01)
+    frames[:, :, :2] += rng.normal(0.0, 0.002, frames[:, :, :2].shape).astype(np.float32)
+    return frames
+
+
+def bicep_curl(n_reps=20, frames_per_rep=40, seed=0):
+    """Rosca bíceps de frente: o cotovelo vai de 175° até 25° (completa) ou 45° (parcial)."""
+    rng = np.random.default_rng(seed)
+    flexion = _cycle(n_reps, [150.0, 130.0, 150.0, 150.0], frames_per_rep)
+    # Algumas repetições deslocam o cotovelo para frente (erro "cotovelo fixo")
+    drift = _cycle(n_reps, [0.0, 0.0, 0.0, 0.1], frames_per_rep)
+    frames = np.zeros((len(flexion), 33, 4), dtype=np.float32)
+    for i, (f, dx) in enumerate(zip(flexion, drift)):
+        elbow_angle = 175.0 - f
+        shoulder = np.array([0.42, 0.3])
+        elbow = shoulder + 0.15 * _direction(90.0) + (dx, 0.0)
+        upper_arm_up = np.degrees(np.arctan2(*(shoulder - elbow)[::-1]))
+        wrist = elbow + 0.14 * _direction(upper_arm_up - elbow_angle)
+        hip = np.array([0.44, 0.55])
+        knee = np.array([0.44, 0.72])
+        ankle = np.array([0.44, 0.9])
+        _fill_body(frames[i], shoulder, elbow, wrist, hip, knee, ankle, ankle + (0.0, 0.02), 0.14)
+        # O lado avaliado pela rosca é o direito: troca os lados
+        frames[i, 11:33] = frames[i, 11:33].reshape(11, 2, 4)[:, ::-1].reshape(22, 4)
+    frames[:, :, :2] += rng.normal(0.0, 0.002, frames[:, :, :2].shape).astype(np.float32)
+    return frames
+
+
+def jumping_jack(n_reps=20, frames_per_rep=30, seed=0):
+    """Polichinelo de frente: braços até 160° e pés a 0,35 (completo) ou 135° e 0,22 (parcial)."""
+    rng = np.random.default_rng(seed)
+    arms = _cycle(n_reps, [140.0, 115.0], frames_per_rep)
+    feet_apart = _cycle(n_reps, [0.25, 0.12], frames_per_rep)
+    frames = np.zeros((len(arms), 33, 4), dtype=np.float32)
+    for i, (a, f) in enumerate(zip(arms, feet_apart)):
+        arm_angle = 20.0 + a
+        feet = 0.1 + f
+        shoulder = np.array([0.58, 0.3])
+        hip = np.array([0.56, 0.55])
+        down = np.degrees(np.arctan2(*(hip - shoulder)[::-1]))
+        elbow = shoulder + 0.14 * _direction(down - arm_angle)
+        wrist = elbow + 0.12 * _direction(down - arm_angle)
+        ankle = np.array([0.5 + feet / 2, 0.9])
+        knee = (hip + ankle) / 2
+        _fill_body(frames[i], shoulder, elbow, wrist, hip, knee, ankle, ankle + (0.02, 0.02), -0.16)
+        frames[i, RIGHT_ANKLE, 0] = 0.5 - feet / 2
+    frames[:, :, :2] += rng.normal(0.0, 0.002, frames[:, :, :2].shape).astype(np.float32)
+    return frames
+
+
+TRAJECTORIES = {
+    "squat": squat,
+    "bicep_curl": bicep_curl,
+    "jumping_jack": jumping_jack,
+}
+
+
+def trajectory(exercise_name, n_reps=20, seed=0):
+    """Retorna (frames, timestamps) da trajetória sintética do exercício."""
+    frames = TRAJECTORIES[exercise_name](n_reps=n_reps, seed=seed)
+    timestamps = np.arange(len(frames), dtype=np.float64) / FPS
+    return frames, timestamps
@@ -1,5 +1,8 @@
-import mediapipe as mp
-from utils import calculate_angle
+import time
+
+from rep_analytics import RepAnalytics
+from rule_engine import RuleEngine
+from utils import PoseLandmark
 
 # Dicionário de configurações para os níveis de todos os exercícios
 level_thresholds = {
@@ -20,132 +23,234 @@ level_thresholds = {
     }
 }
 
+# Tolerâncias fixas (iguais em todos os níveis), em coordenadas normalizadas
+THRESHOLD_KNEE_FOOT_OFFSET = 0.05
+ELBOW_MOVEMENT_THRESHOLD = 0.07
+
+# Regras de cada exercício, avaliadas pelo RuleEngine (veja rule_engine.py).
+# Um exercício novo precisa apenas de uma entrada aqui e outra em level_thresholds.
+EXERCISE_RULES = {
+    "squat": {
+        "angles": {
+            "knee_angle": (PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_ANKLE),
+            "trunk_angle": (PoseLandmark.LEFT_KNEE, PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_SHOULDER),
+        },
+        "coords": {
+            "hip_y": (PoseLandmark.LEFT_HIP, 1),
+            "knee_x": (PoseLandmark.LEFT_KNEE, 0),
+            "knee_y": (PoseLandmark.LEFT_KNEE, 1),
+            "foot_index_x": (PoseLandmark.LEFT_FOOT_INDEX, 0),
+        },
+        "derived": {
+            "is_hip_below_knee": lambda v: (v["hip_y"] > v["knee_y"] - v["hip_below_knee_threshold"]) | ~v["hip_below_knee_required"],
+        },
+        "defaults": {"hip_below_knee_threshold": 0.0},
+        "stages": ("up", "down"),
+        "initial_stage": "up",
+        "reset_stage": "up",
+        "transitions": [
+            {"stage": "up", "when": lambda v: (v["knee_angle"] < v["knee_angle_down"]) & v["is_hip_below_knee"],
+             "to": "down", "feedback": "Subindo..."},
+            {"stage": "up", "when": lambda v: v["knee_angle"] < v["knee_angle_down"],
+             "feedback": "Agache mais!", "error": "Agache mais!"},
+            {"stage": "down", "when": lambda v: v["knee_angle"] > v["knee_angle_up"],
+             "to": "up", "rep": True, "feedback": "Boa! Repeticao completa!"},
+        ],
+        "errors": [
+            {"message": "Coluna reta! Peito aberto.", "after_transition": True,
+             "when": lambda v: (v["knee_angle"] < 160) & (v["trunk_angle"] < 150)},
+            {"message": "Joelhos para tras!", "after_transition": True,
+             "when": lambda v: (v["knee_angle"] < 160) & (v["knee_x"] > v["foot_index_x"] + THRESHOLD_KNEE_FOOT_OFFSET)},
+        ],
+        "near_transition": ("knee_angle", "<", "knee_angle_down"),
+        "analytics": {"angle": "knee_angle", "turning_point": "min", "eccentric": "before"},
+    },
+    "bicep_curl": {
+        "angles": {
+            "elbow_angle": (PoseLandmark.RIGHT_SHOULDER, PoseLandmark.RIGHT_ELBOW, PoseLandmark.RIGHT_WRIST),
+            "body_posture_angle": (PoseLandmark.RIGHT_KNEE, PoseLandmark.RIGHT_HIP, PoseLandmark.RIGHT_SHOULDER),
+        },
+        "coords": {"elbow_x": (PoseLandmark.RIGHT_ELBOW, 0)},
+        "stages": ("down", "up"),
+        "initial_stage": "down",
+        # BaseExercise.reset sempre voltou o estágio para "up"
+        "reset_stage": "up",
+        "transitions": [
+            {"stage": "down", "when": lambda v: v["elbow_angle"] < v["elbow_angle_down"],
+             "to": "up", "feedback": "Estenda o braco"},
+            {"stage": "up", "when": lambda v: v["elbow_angle"] > v["elbow_angle_up"],
+             "to": "down", "rep": True, "feedback": "Boa!"},
+            {"stage": "up", "when": lambda v: v["elbow_angle"] > v["elbow_angle_down"],
+             "feedback": "Estenda o braco completamente"},
+        ],
+        "errors": [
+            {"message": "Mantenha a postura reta!", "when": lambda v: v["body_posture_angle"] < 165},
+            {"message": "Mantenha o cotovelo fixo!", "stage": "up",
+             "when": lambda v: abs(v["elbow_x"] - v["initial_elbow_x"]) > ELBOW_MOVEMENT_THRESHOLD},
+        ],
+        # Posição x do cotovelo enquanto o braço está estendido, para detectar o deslocamento na subida
+        "latches": {"initial_elbow_x": {"stage": "down", "value": "elbow_x", "initial": 0.0}},
+        "near_transition": ("elbow_angle", "<", "elbow_angle_down"),
+        "analytics": {"angle": "elbow_angle", "turning_point": "min", "eccentric": "after"},
+    },
+    "jumping_jack": {
+        "angles": {
+            "shoulder_angle": (PoseLandmark.LEFT_HIP, PoseLandmark.LEFT_SHOULDER, PoseLandmark.LEFT_ELBOW),
+        },
+        "coords": {
+            "left_ankle_x": (PoseLandmark.LEFT_ANKLE, 0),
+            "right_ankle_x": (PoseLandmark.RIGHT_ANKLE, 0),
+        },
+        "derived": {
+            "arms_up": lambda v: v["shoulder_angle"] > v["shoulder_angle_up"],
+            "legs_apart": lambda v: abs(v["left_ankle_x"] - v["right_ankle_x"]) > v["feet_distance_apart"],
+        },
+        "stages": ("down", "up"),
+        "initial_stage": "down",
+        "reset_stage": "up",
+        "transitions": [
+            {"stage": "down", "when": lambda v: v["arms_up"] & v["legs_apart"],
+             "to": "up", "feedback": "Fechando..."},
+            {"stage": "up", "when": lambda v: ~v["arms_up"] & ~v["legs_apart"],
+             "to": "down", "rep": True, "feedback": "Boa!"},
+        ],
+        "errors": [
+            {"message": "Levante mais os bracos!", "stage": "up", "after_transition": True,
+             "when": lambda v: ~v["arms_up"]},
+            {"message": "Afaste mais as pernas!", "stage": "up", "after_transition": True,
+             "when": lambda v: ~v["legs_apart"]},
+        ],
+        "near_transition": ("shoulder_angle", ">", "shoulder_angle_up"),
+        "analytics": {"angle": "shoulder_angle", "turning_point": "max", "eccentric": "after"},
+    },
+}
+
+
 class BaseExercise:
-    """Classe base para todos os exercícios."""
-    def __init__(self):
-        self.reps = 0
-        self.stage = None
-        self.feedback = ""
-        self.errors = []
+    """
+    Visão de um exercício em um único nível: um RuleEngine de uma coluna com as
+    regras de EXERCISE_RULES[name] e os limiares de level_thresholds[name][level].
+    Serve para qualquer exercício de EXERCISE_RULES (`name`); as subclasses só fixam
+    NAME e acrescentam atributos próprios do exercício.
+    As métricas de cada repetição ficam em `analytics` (veja rep_analytics.py).
+    """
+    NAME = None
+    # Margem (em graus) em torno do limiar de transição em que a pose deve rodar a cada frame
+    TRANSITION_MARGIN = 15
+
+    def __init__(self, level, name=None):
+        self.name = name or self.NAME
+        self.level = level
+        rules = EXERCISE_RULES[self.name]
+        self.engine = RuleEngine(rules, [level_thresholds[self.name][level]], labels=[level])
+        self.analytics = RepAnalytics(list(rules["angles"]), **rules["analytics"])
+
+    @property
+    def reps(self):
+        return int(self.engine.reps[0])
+
+    @property
+    def stage(self):
+        return self.engine.stage_name()
+
+    @property
+    def feedback(self):
+        return self.engine.feedback_text()
+
+    @property
+    def errors(self):
+        return self.engine.errors()
+
+    @property
+    def required_joints(self):
+        """Landmarks que precisam estar visíveis para que o frame seja avaliado."""
+        return self.engine.required_joints
 
-    def process_landmarks(self, landmarks):
-        raise NotImplementedError("Este método deve ser implementado pela subclasse.")
+    @property
+    def last_angles(self):
+        return self.engine.last_angles
+
+    @property
+    def thresholds(self):
+        return self.engine.threshold_sets[0]
+
+    @thresholds.setter
+    def thresholds(self, thresholds):
+        self.engine.set_thresholds(0, thresholds)
+
+    @property
+    def last_rep(self):
+        """Métricas da última repetição completa (None antes da primeira)."""
+        return self.analytics.last_event
+
+    def pop_rep_events(self):
+        """Eventos de repetição completa ainda não lidos, em ordem."""
+        return self.analytics.pop_events()
+
+    def process_landmarks(self, landmarks, timestamp=None):
+        """Avança as regras com um frame; `timestamp` (segundos) alimenta as métricas por repetição."""
+        engine = self.engine
+        reps_before = engine.reps[0]
+        engine.process_landmarks(landmarks)
+        reps = engine.reps[0]
+        self.analytics.update(
+            time.perf_counter() if timestamp is None else timestamp,
+            engine.last_angles, engine.errors(), reps > reps_before, int(reps),
+        )
+
+    def clear_errors(self):
+        """Descarta os erros de postura do último frame avaliado."""
+        self.engine.clear_errors()
+
+    def near_transition(self):
+        """
+        Indica se o último ângulo medido está perto do limiar que marca o fundo da
+        repetição. Usado pelo agendador de inferência para forçar a taxa cheia.
+        """
+        return bool(self.engine.near_transition(self.TRANSITION_MARGIN)[0])
 
     def reset(self):
-        self.reps = 0
-        self.stage = "up" if self.stage is not None else None
-        self.feedback = ""
-        self.errors = []
+        self.engine.reset()
+        self.analytics.reset()
 
 class Squat(BaseExercise):
-    def __init__(self, level):
-        super().__init__()
-        self.stage = "up"
-        self.level = level
-        self.thresholds = level_thresholds["squat"][level]
-        self.mp_pose = mp.solutions.pose
-        self.THRESHOLD_KNEE_FOOT_OFFSET = 0.05
-
-    def process_landmarks(self, landmarks):
-        self.errors = []
-        hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y]
-        knee = [landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_KNEE.value].y]
-        ankle = [landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value].y]
-        shoulder = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-        foot_index = [landmarks[self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX.value].y]
-        knee_angle = calculate_angle(hip, knee, ankle)
-        trunk_angle = calculate_angle(knee, hip, shoulder)
-        is_hip_below_knee = (hip[1] > knee[1] - self.thresholds.get("hip_below_knee_threshold", 0.0)) if self.thresholds["hip_below_knee_required"] else True
-
-        if self.stage == "up":
-            if knee_angle < self.thresholds["knee_angle_down"]:
-                if is_hip_below_knee:
-                    self.stage = "down"
-                    self.feedback = "Subindo..."
-                else:
-                    self.feedback = "Agache mais!"
-                    self.errors.append("Agache mais!")
-        elif self.stage == "down":
-            if knee_angle > self.thresholds["knee_angle_up"]:
-                self.reps += 1
-                self.stage = "up"
-                self.feedback = "Boa! Repeticao completa!"
-
-        is_in_squat_position = knee_angle < 160
-        if is_in_squat_position:
-            if trunk_angle < 150:
-                 self.errors.append("Coluna reta! Peito aberto.")
-            if knee[0] > foot_index[0] + self.THRESHOLD_KNEE_FOOT_OFFSET:
-                 self.errors.append("Joelhos para tras!")
+    NAME = "squat"
 
 class BicepCurl(BaseExercise):
-    def __init__(self, level):
-        super().__init__()
-        self.stage = "down"
-        self.level = level
-        self.thresholds = level_thresholds["bicep_curl"][level]
-        self.mp_pose = mp.solutions.pose
-        self.ELBOW_MOVEMENT_THRESHOLD = 0.07
-        self.initial_elbow_x = 0
-
-    def process_landmarks(self, landmarks):
-        self.errors = []
-        shoulder = [landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x, landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-        elbow = [landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value].x, landmarks[self.mp_pose.PoseLandmark.RIGHT_ELBOW.value].y]
-        wrist = [landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value].x, landmarks[self.mp_pose.PoseLandmark.RIGHT_WRIST.value].y]
-        hip = [landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].x, landmarks[self.mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-        knee = [landmarks[self.mp_pose.PoseLandmark.RIGHT_KNEE.value].x, landmarks[self.mp_pose.PoseLandmark.RIGHT_KNEE.value].y]
-        elbow_angle = calculate_angle(shoulder, elbow, wrist)
-        body_posture_angle = calculate_angle(knee, hip, shoulder)
-
-        if body_posture_angle < 165:
-            self.errors.append("Mantenha a postura reta!")
-
-        if self.stage == "down":
-            if elbow_angle < self.thresholds["elbow_angle_down"]:
-                self.stage = "up"
-                self.feedback = "Estenda o braco"
-            self.initial_elbow_x = elbow[0]
-        elif self.stage == "up":
-            if abs(elbow[0] - self.initial_elbow_x) > self.ELBOW_MOVEMENT_THRESHOLD:
-                self.errors.append("Mantenha o cotovelo fixo!")
-            if elbow_angle > self.thresholds["elbow_angle_up"]:
-                self.stage = "down"
-                self.reps += 1
-                self.feedback = "Boa!"
-            elif elbow_angle > self.thresholds["elbow_angle_down"]:
-                 self.feedback = "Estenda o braco completamente"
+    NAME = "bicep_curl"
+
+    @property
+    def initial_elbow_x(self):
+        return float(self.engine.latches["initial_elbow_x"][0])
 
 class JumpingJack(BaseExercise):
-    def __init__(self, level):
-        super().__init__()
-        self.stage = "down"
-        self.level = level
-        self.thresholds = level_thresholds["jumping_jack"][level]
-        self.mp_pose = mp.solutions.pose
-
-    def process_landmarks(self, landmarks):
-        self.errors = []
-        left_shoulder = [landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value].y]
-        left_hip = [landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_HIP.value].y]
-        left_elbow = [landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].x, landmarks[self.mp_pose.PoseLandmark.LEFT_ELBOW.value].y]
-        left_ankle = landmarks[self.mp_pose.PoseLandmark.LEFT_ANKLE.value]
-        right_ankle = landmarks[self.mp_pose.PoseLandmark.RIGHT_ANKLE.value]
-        shoulder_angle = calculate_angle(left_hip, left_shoulder, left_elbow)
-        feet_distance = abs(left_ankle.x - right_ankle.x)
-
-        arms_up = shoulder_angle > self.thresholds["shoulder_angle_up"]
-        legs_apart = feet_distance > self.thresholds["feet_distance_apart"]
-
-        if self.stage == "down" and arms_up and legs_apart:
-            self.stage = "up"
-            self.feedback = "Fechando..."
-        elif self.stage == "up" and not arms_up and not legs_apart:
-            self.stage = "down"
-            self.reps += 1
-            self.feedback = "Boa!"
-            
-        if self.stage == 'up' and not arms_up:
-            self.errors.append("Levante mais os bracos!")
-        if self.stage == 'up' and not legs_apart:
-            self.errors.append("Afaste mais as pernas!")
+    NAME = "jumping_jack"
+
+
+# Exercícios com atributos próprios; os demais usam BaseExercise diretamente
+EXERCISE_CLASSES = {cls.NAME: cls for cls in (Squat, BicepCurl, JumpingJack)}
+
+
+def get_exercise_instance(name, lvl):
+    """
+    Retorna a instância do exercício pelo nome, montada a partir de EXERCISE_RULES e
+    level_thresholds, ou None se o exercício ou o nível não forem reconhecidos.
+    """
+    if name not in EXERCISE_RULES or lvl not in level_thresholds.get(name, {}):
+        return None
+    return EXERCISE_CLASSES.get(name, BaseExercise)(lvl, name)
+
+
+def get_multi_level_engine(name, levels=None, threshold_sets=None):
+    """
+    Motor que avalia o exercício em vários níveis na mesma passada (um frame, um cálculo
+    de ângulos). Por padrão usa todos os níveis de level_thresholds; `threshold_sets`
+    ({rótulo: limiares}) permite comparar conjuntos personalizados. Retorna None se o
+    exercício não for reconhecido.
+    """
+    if name not in EXERCISE_RULES:
+        return None
+    if threshold_sets is None:
+        levels = levels or list(level_thresholds[name])
+        threshold_sets = {level: level_thresholds[name][level] for level in levels}
+    return RuleEngine(EXERCISE_RULES[name], list(threshold_sets.values()), labels=list(threshold_sets))
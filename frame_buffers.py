@@ -0,0 +1,67 @@
+import threading
+
+import cv2
+import numpy as np
+
+# --- Buffers de imagem pré-alocados e reaproveitados a cada frame ---
+
+
+class FrameBufferPool:
+    """
+    Pool de buffers de frame compartilhado pelas threads do pipeline: a captura pega um
+    buffer para o cap.read e quem termina de usar o frame (ou o descarta) o devolve.
+    O pool cresce só até o número de frames em trânsito; depois disso nenhum frame novo
+    é alocado. Um buffer não devolvido é apenas coletado pelo Python.
+    """
+    def __init__(self):
+        self._free = []
+        self._lock = threading.Lock()
+        self.allocated = 0
+
+    def acquire(self, shape, dtype=np.uint8):
+        with self._lock:
+            for i, buffer in enumerate(self._free):
+                if buffer.shape == shape and buffer.dtype == dtype:
+                    return self._free.pop(i)
+            self.allocated += 1
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, buffer):
+        if buffer is None:
+            return
+        with self._lock:
+            self._free.append(buffer)
+
+
+class ScratchBuffer:
+    """
+    Memória reutilizável para saídas de tamanho variável (o recorte da ROI muda de
+    tamanho): view() devolve um array contíguo com o formato pedido sobre o mesmo bloco,
+    que só é realocado quando um formato maior aparece.
+    """
+    def __init__(self, dtype=np.uint8):
+        self._flat = np.empty(0, dtype=dtype)
+
+    def view(self, shape):
+        size = int(np.prod(shape))
+        if size > self._flat.size:
+            self._flat = np.empty(size, dtype=self._flat.dtype)
+        return self._flat[:size].reshape(shape)
+
+
+class MirroredResize:
+    """
+    Prepara a imagem da tela: espelha o frame da câmera na resolução original (menos
+    pixels que a tela) e redimensiona para um buffer de tela fixo, sem alocar nada.
+    O resultado é idêntico ao de cv2.flip(cv2.resize(frame, tamanho), 1).
+    O buffer retornado é sobrescrito na chamada seguinte.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.display = np.empty((height, width, 3), dtype=np.uint8)
+        self._mirrored = ScratchBuffer()
+
+    def __call__(self, frame):
+        mirrored = cv2.flip(frame, 1, dst=self._mirrored.view(frame.shape))
+        return cv2.resize(mirrored, (self.width, self.height), dst=self.display)
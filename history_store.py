@@ -0,0 +1,255 @@
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+
+# --- Histórico de sessões em SQLite, gravado por uma thread de fundo ---
+#
+# O loop de frames só acrescenta eventos a uma deque (sem lock, sem espera, sem formatar
+# nada); a thread de escrita acorda periodicamente, monta as linhas e grava em lotes, uma
+# transação por lote, no banco em modo WAL. Em WAL as consultas do menu leem em paralelo
+# com a escrita.
+
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".fitvision", "history.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    user TEXT NOT NULL,
+    exercise TEXT NOT NULL,
+    level TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    ended_at REAL,
+    reps INTEGER,
+    frames INTEGER,
+    fps REAL
+);
+CREATE TABLE IF NOT EXISTS reps (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    rep INTEGER NOT NULL,
+    t REAL NOT NULL,
+    duration REAL,
+    eccentric_time REAL,
+    concentric_time REAL,
+    min_angle REAL,
+    max_angle REAL,
+    range_of_motion REAL,
+    peak_velocity REAL,
+    error_frames TEXT
+);
+CREATE TABLE IF NOT EXISTS errors (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    t REAL NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_user ON sessions(user, started_at);
+CREATE INDEX IF NOT EXISTS sessions_by_user_exercise ON sessions(user, exercise, started_at);
+CREATE INDEX IF NOT EXISTS sessions_by_exercise ON sessions(exercise, started_at);
+CREATE INDEX IF NOT EXISTS reps_by_session ON reps(session_id, rep);
+CREATE INDEX IF NOT EXISTS errors_by_session ON errors(session_id, message);
+"""
+
+_REP_COLUMNS = ("duration", "eccentric_time", "concentric_time", "min_angle", "max_angle",
+                "range_of_motion", "peak_velocity")
+
+
+def _connect(path):
+    connection = sqlite3.connect(path, timeout=10.0)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+
+class SessionLog:
+    """
+    Eventos de uma sessão, enviados ao HistoryStore. Os instantes `t` são segundos
+    desde o início da sessão. Erros são registrados quando aparecem (um evento por
+    mensagem nova, não um por frame).
+    """
+    def __init__(self, store, user, exercise_name, level):
+        self.store = store
+        self.session_id = uuid.uuid4().hex
+        self.started_at = time.time()
+        self._active_errors = frozenset()
+        store.submit(("session", (self.session_id, user, exercise_name, level, self.started_at)))
+
+    def rep(self, event, t):
+        """Registra uma repetição completa (evento de RepAnalytics; a linha é montada na thread de escrita)."""
+        self.store.submit(("rep", (self.session_id, t, event)))
+
+    def errors(self, messages, t):
+        """Recebe os erros do frame e registra os que não estavam presentes no frame anterior."""
+        active = frozenset(messages)
+        if active == self._active_errors:
+            return
+        for message in active - self._active_errors:
+            self.store.submit(("error", (self.session_id, t, message)))
+        self._active_errors = active
+
+    def end(self, stats):
+        self.store.submit(("end", (
+            time.time(), stats.get("reps"), stats.get("frames_rendered"), stats.get("fps"), self.session_id,
+        )))
+
+
+class HistoryStore:
+    """
+    Banco de histórico com uma thread de escrita. submit() nunca bloqueia: com a fila
+    cheia (`max_pending` eventos) o evento é descartado e contado em `dropped`.
+    A thread grava a cada `flush_interval` segundos (ou antes, quando `batch_size`
+    eventos se acumulam), em transações de até `batch_size` eventos.
+    """
+    def __init__(self, path=DEFAULT_HISTORY_PATH, max_pending=10000, batch_size=500, flush_interval=0.5):
+        self.path = path
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._pending = collections.deque()
+        self._wake = threading.Event()
+        self._closing = False
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(_connect(path)) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+        self._thread = threading.Thread(target=self._write_loop, name="fitvision-history", daemon=True)
+        self._thread.start()
+
+    def begin_session(self, user, exercise_name, level):
+        return SessionLog(self, user, exercise_name, level)
+
+    def submit(self, event):
+        pending = len(self._pending)
+        if pending >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(event)
+        if pending + 1 == self.batch_size:
+            self._wake.set()
+
+    def _write_loop(self):
+        connection = _connect(self.path)
+        connection.execute("PRAGMA synchronous=NORMAL")
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            closing = self._closing
+            self._drain(connection)
+            if closing:
+                break
+        connection.close()
+
+    def _drain(self, connection):
+        """Grava tudo o que está pendente, em lotes; libera os flush() na ordem em que foram pedidos."""
+        while self._pending:
+            batch = []
+            waiter = None
+            while self._pending and len(batch) < self.batch_size:
+                event = self._pending.popleft()
+                if isinstance(event, threading.Event):
+                    waiter = event
+                    break
+                batch.append(event)
+            if batch:
+                try:
+                    self._write_batch(connection, batch)
+                except sqlite3.Error as e:
+                    print(f"Erro ao gravar o histórico: {e}")
+            if waiter is not None:
+                waiter.set()
+
+    def _write_batch(self, connection, batch):
+        rows = {"session": [], "rep": [], "error": [], "end": []}
+        for kind, row in batch:
+            if kind == "rep":
+                session_id, t, event = row
+                row = (session_id, event["rep"], t) + tuple(event.get(name) for name in _REP_COLUMNS) + (
+                    json.dumps(event.get("error_frames", {}), ensure_ascii=False),)
+            rows[kind].append(row)
+        with connection:
+            connection.executemany(
+                "INSERT OR IGNORE INTO sessions (id, user, exercise, level, started_at) VALUES (?, ?, ?, ?, ?)",
+                rows["session"])
+            connection.executemany(
+                "INSERT INTO reps (session_id, rep, t, duration, eccentric_time, concentric_time, min_angle, "
+                "max_angle, range_of_motion, peak_velocity, error_frames) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows["rep"])
+            connection.executemany("INSERT INTO errors (session_id, t, message) VALUES (?, ?, ?)", rows["error"])
+            connection.executemany(
+                "UPDATE sessions SET ended_at = ?, reps = ?, frames = ?, fps = ? WHERE id = ?", rows["end"])
+        self.written += sum(len(r) for r in rows.values())
+        self.batches += 1
+
+    def flush(self, timeout=None):
+        """Aguarda a gravação de tudo o que foi enfileirado até aqui. Retorna False no timeout."""
+        done = threading.Event()
+        self._pending.append(done)
+        self._wake.set()
+        return done.wait(timeout)
+
+    def close(self):
+        """Grava o que falta e encerra a thread de escrita."""
+        if self._thread.is_alive():
+            self._closing = True
+            self._wake.set()
+            self._thread.join()
+
+    # --- Consultas (conexão própria: em WAL não esperam a thread de escrita) ---
+
+    def _query(self, sql, params):
+        with closing(_connect(self.path)) as connection:
+            return [dict(row) for row in connection.execute(sql, params)]
+
+    def users(self):
+        return [row["user"] for row in self._query("SELECT DISTINCT user FROM sessions ORDER BY user", ())]
+
+    def sessions(self, user=None, exercise_name=None, limit=50):
+        """Sessões mais recentes, filtradas por usuário e/ou exercício."""
+        conditions, params = [], []
+        if user is not None:
+            conditions.append("user = ?")
+            params.append(user)
+        if exercise_name is not None:
+            conditions.append("exercise = ?")
+            params.append(exercise_name)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._query(f"SELECT * FROM sessions {where}ORDER BY started_at DESC LIMIT ?", params + [limit])
+
+    def rep_history(self, user, exercise_name, limit=500):
+        """Repetições mais recentes do usuário no exercício, com o instante absoluto (`at`)."""
+        rows = self._query(
+            "SELECT r.*, s.level, s.started_at + r.t AS at FROM sessions s JOIN reps r ON r.session_id = s.id "
+            "WHERE s.user = ? AND s.exercise = ? ORDER BY s.started_at DESC, r.rep DESC LIMIT ?",
+            (user, exercise_name, limit),
+        )
+        for row in rows:
+            row["error_frames"] = json.loads(row["error_frames"]) if row["error_frames"] else {}
+        return rows
+
+    def error_counts(self, user, exercise_name=None):
+        """Quantas vezes cada erro apareceu nas sessões do usuário (mais frequentes primeiro)."""
+        sql = "SELECT e.message, COUNT(*) AS count FROM sessions s JOIN errors e ON e.session_id = s.id WHERE s.user = ?"
+        params = [user]
+        if exercise_name is not None:
+            sql += " AND s.exercise = ?"
+            params.append(exercise_name)
+        return self._query(sql + " GROUP BY e.message ORDER BY count DESC", params)
+
+    def summary(self, user, exercise_name=None):
+        """Totais do usuário: sessões, repetições e a última sessão."""
+        sql = "SELECT COUNT(*) AS sessions, COALESCE(SUM(reps), 0) AS reps, MAX(started_at) AS last_at FROM sessions WHERE user = ?"
+        params = [user]
+        if exercise_name is not None:
+            sql += " AND exercise = ?"
+            params.append(exercise_name)
+        return self._query(sql, params)[0]
+
+    def stats(self):
+        return {"written": self.written, "dropped": self.dropped, "batches": self.batches,
+                "pending": len(self._pending)}
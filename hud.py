@@ -0,0 +1,188 @@
+import time
+
+import cv2
+import numpy as np
+
+# --- Compositor da interface (HUD) com cache dos elementos estáticos ---
+
+
+def hex_to_bgr(hex_color):
+    """Converte uma cor hexadecimal para o formato BGR do OpenCV."""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (4, 2, 0))
+
+# Paleta de cores (Nord) para consistência visual
+NORD_NIGHT = hex_to_bgr("#2E3440")
+NORD_SNOW = hex_to_bgr("#D8DEE9")
+NORD_FROST_GREEN = hex_to_bgr("#A3BE8C")
+NORD_FROST_CYAN = hex_to_bgr("#88C0D0")
+NORD_AURORA_RED = hex_to_bgr("#BF616A")
+
+
+class TextSprite:
+    """
+    Texto pré-renderizado: guarda a cobertura do anti-aliasing do cv2.putText como
+    pesos float32 e compõe o texto sobre a imagem apenas no seu retângulo.
+    """
+    def __init__(self, text, font, scale, color, thickness):
+        (w, h), baseline = cv2.getTextSize(text, font, scale, thickness)
+        self.text = text
+        self.width = w
+        self.height = h
+        self.pad = thickness + 1  # folga para o traço e o anti-aliasing
+        mask = np.zeros((h + baseline + 2 * self.pad, w + 2 * self.pad), dtype=np.uint8)
+        cv2.putText(mask, text, (self.pad, self.pad + h), font, scale, 255, thickness, cv2.LINE_AA)
+        self.weights = mask.astype(np.float32) / 255.0
+        self.inverse_weights = 1.0 - self.weights
+        self.color_patch = np.empty(mask.shape + (3,), dtype=np.uint8)
+        self.color_patch[:] = color
+
+    def draw(self, image, x, y):
+        """Desenha o texto com a origem (canto inferior esquerdo) em (x, y), como o cv2.putText."""
+        top, left = y - self.height - self.pad, x - self.pad
+        ph, pw = self.weights.shape
+        y0, x0 = max(top, 0), max(left, 0)
+        y1, x1 = min(top + ph, image.shape[0]), min(left + pw, image.shape[1])
+        if y0 >= y1 or x0 >= x1:
+            return
+        sy, sx = y0 - top, x0 - left
+        window = (slice(sy, sy + y1 - y0), slice(sx, sx + x1 - x0))
+        roi = image[y0:y1, x0:x1]
+        cv2.blendLinear(self.color_patch[window], roi, self.weights[window], self.inverse_weights[window], dst=roi)
+
+
+class PanelBackground:
+    """Fundo semi-transparente que mistura a cor apenas no sub-retângulo do painel."""
+    def __init__(self, x, y, width, height, color, alpha=0.6):
+        self.x, self.y, self.width, self.height = x, y, width, height
+        self.alpha = alpha
+        # O cv2.rectangle preenchido inclui os dois cantos, daí o +1
+        self.color_patch = np.empty((height + 1, width + 1, 3), dtype=np.uint8)
+        self.color_patch[:] = color
+
+    def draw(self, image):
+        x0, y0 = max(self.x, 0), max(self.y, 0)
+        x1 = min(self.x + self.width + 1, image.shape[1])
+        y1 = min(self.y + self.height + 1, image.shape[0])
+        if x0 >= x1 or y0 >= y1:
+            return
+        roi = image[y0:y1, x0:x1]
+        patch = self.color_patch[y0 - self.y:y1 - self.y, x0 - self.x:x1 - self.x]
+        cv2.addWeighted(patch, self.alpha, roi, 1 - self.alpha, 0, dst=roi)
+
+
+class HudCompositor:
+    """
+    Desenha os mesmos painéis do draw_hud (repetições, informações, feedback e erros),
+    mas pré-renderiza uma vez por sessão o painel de informações, o rótulo "REPS" e os
+    fundos dos painéis. Textos dinâmicos só são renderizados de novo quando o valor muda,
+    e a mistura semi-transparente é feita só no retângulo de cada painel.
+    """
+    def __init__(self, exercise_name, level, width, height):
+        self.width = width
+        self.height = height
+
+        # 1. Painel de Repetições (canto superior direito)
+        panel_w, panel_h = 160, 120
+        self.reps_panel = PanelBackground(width - panel_w - 40, 40, panel_w, panel_h, NORD_NIGHT)
+        self.reps_label = TextSprite("REPS", cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_SNOW, 2)
+        self._reps_value = None
+        self._reps_sprite = None
+
+        # 2. Painel de Informações do Exercício (canto superior esquerdo)
+        self.info_panel = PanelBackground(40, 40, 350, 120, NORD_NIGHT)
+        self.info_lines = [
+            (TextSprite(f"Exercicio: {exercise_name.replace('_', ' ').upper()}", cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_FROST_CYAN, 2), 60, 80),
+            (TextSprite(f"Nivel: {level.upper()}", cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_FROST_CYAN, 2), 60, 120),
+        ]
+
+        # 3. Painel de Feedback e 4. Painel de Erros: montados quando o valor muda
+        self._feedback_value = None
+        self._feedback_layout = None
+        self._errors_value = None
+        self._errors_layout = None
+        self._error_sprites = {}  # as mensagens de erro formam um conjunto pequeno e fixo
+
+    def draw(self, image, reps, feedback, all_errors):
+        """Compõe a interface sobre a imagem (no lugar)."""
+        panel = self.reps_panel
+        panel.draw(image)
+        self.reps_label.draw(image, panel.x + (panel.width - self.reps_label.width) // 2, panel.y + 40)
+        if reps != self._reps_value:
+            self._reps_value = reps
+            self._reps_sprite = TextSprite(str(reps), cv2.FONT_HERSHEY_TRIPLEX, 2, NORD_FROST_GREEN, 5)
+        self._reps_sprite.draw(image, panel.x + (panel.width - self._reps_sprite.width) // 2, panel.y + 100)
+
+        self.info_panel.draw(image)
+        for sprite, x, y in self.info_lines:
+            sprite.draw(image, x, y)
+
+        if feedback != self._feedback_value:
+            self._feedback_value = feedback
+            self._feedback_layout = self._layout_feedback(feedback) if feedback else None
+        if self._feedback_layout is not None:
+            background, sprite, x, y = self._feedback_layout
+            background.draw(image)
+            sprite.draw(image, x, y)
+
+        if all_errors != self._errors_value:
+            self._errors_value = list(all_errors)
+            self._errors_layout = self._layout_errors(all_errors) if all_errors else None
+        if self._errors_layout is not None:
+            background, lines = self._errors_layout
+            background.draw(image)
+            for sprite, x, y in lines:
+                sprite.draw(image, x, y)
+
+    def _layout_feedback(self, feedback):
+        feedback_color = NORD_FROST_GREEN if "Boa" in feedback else NORD_SNOW
+        sprite = TextSprite(feedback, cv2.FONT_HERSHEY_SIMPLEX, 1, feedback_color, 2)
+        x_pos = (self.width - sprite.width) // 2
+        y_pos = self.height - 80
+        background = PanelBackground(x_pos - 20, y_pos - sprite.height - 10, sprite.width + 40, sprite.height + 30, NORD_NIGHT)
+        return background, sprite, x_pos, y_pos
+
+    def _layout_errors(self, all_errors):
+        error_panel_h = len(all_errors) * 35 + 25
+        y_offset_errors = self.height - 40 - error_panel_h
+        background = PanelBackground(self.width - 440, y_offset_errors, 400, error_panel_h, NORD_NIGHT)
+        lines = []
+        for i, error in enumerate(all_errors):
+            sprite = self._error_sprites.get(error)
+            if sprite is None:
+                sprite = TextSprite(f"- {error}", cv2.FONT_HERSHEY_SIMPLEX, 0.7, NORD_AURORA_RED, 2)
+                self._error_sprites[error] = sprite
+            lines.append((sprite, self.width - 420, y_offset_errors + 30 + i * 35))
+        return background, lines
+
+
+class StageStatsOverlay:
+    """
+    Painel de depuração com p50/p95/p99 de cada estágio do FrameProfiler, no último
+    intervalo do profiler (não na sessão inteira). O texto é recalculado no máximo a
+    cada `refresh_every` segundos.
+    """
+    def __init__(self, x=40, y=180, refresh_every=0.5):
+        self.x = x
+        self.y = y
+        self.refresh_every = refresh_every
+        self._lines = []
+        self._background = None
+        self._refreshed_at = 0.0
+
+    def draw(self, image, profiler):
+        now = time.perf_counter()
+        if now - self._refreshed_at >= self.refresh_every:
+            self._refreshed_at = now
+            self._lines = [
+                f"{stage:<11} p50 {s['p50_ms']:6.2f}  p95 {s['p95_ms']:6.2f}  p99 {s['p99_ms']:6.2f} ms"
+                for stage, s in sorted(profiler.recent_summary().items())
+            ]
+            height = len(self._lines) * 22 + 16
+            if self._background is None or self._background.height != height:
+                self._background = PanelBackground(self.x, self.y, 470, height, NORD_NIGHT, alpha=0.75)
+        if not self._lines:
+            return
+        self._background.draw(image)
+        for i, line in enumerate(self._lines):
+            cv2.putText(image, line, (self.x + 10, self.y + 24 + i * 22), cv2.FONT_HERSHEY_PLAIN, 1.1, NORD_SNOW, 1, cv2.LINE_AA)
@@ -0,0 +1,101 @@
+import os
+import struct
+
+import numpy as np
+
+# --- Gravação compacta dos landmarks por frame (sem vídeo) ---
+#
+# Formato do arquivo (.fvlm, little-endian):
+#   cabeçalho de 16 bytes: magic b"FVLM", versão (uint16), nº de landmarks (uint16),
+#                          nº de frames (uint64, atualizado ao fechar)
+#   registros de tamanho fixo: t (float64, segundos desde o início), flags (uint32),
+#                              landmarks (float32[33][4] = x, y, z, visibility)
+# Os registros podem ser mapeados em memória diretamente com np.memmap.
+
+MAGIC = b"FVLM"
+VERSION = 1
+NUM_LANDMARKS = 33
+HEADER = struct.Struct("<4sHHQ")
+
+FLAG_PERSON = 1     # havia landmarks neste frame
+FLAG_PREDICTED = 2  # landmarks previstos pelo agendador (sem inferência)
+
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"),
+    ("flags", "<u4"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 4)),
+])
+
+
+class LandmarkRecorder:
+    """
+    Grava os landmarks de cada frame em um arquivo .fvlm. Os registros são acumulados
+    em um bloco pré-alocado e escritos em lote, para não fazer I/O a cada frame.
+    """
+    def __init__(self, path, chunk_size=256):
+        self.path = path
+        self.frames = 0
+        self._chunk = np.zeros(chunk_size, dtype=RECORD_DTYPE)
+        self._pending = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS, 0))
+
+    def write(self, t, landmarks, predicted=False):
+        """Registra um frame. `landmarks` é o array (33, 4) ou None se ninguém foi detectado."""
+        record = self._chunk[self._pending]
+        record["t"] = t
+        if landmarks is None:
+            record["flags"] = 0
+            record["landmarks"] = 0.0
+        else:
+            record["flags"] = FLAG_PERSON | (FLAG_PREDICTED if predicted else 0)
+            record["landmarks"] = landmarks
+        self._pending += 1
+        self.frames += 1
+        if self._pending == len(self._chunk):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._chunk[:self._pending].tobytes())
+            self._pending = 0
+        self._file.flush()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, NUM_LANDMARKS, self.frames))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def load_recording(path):
+    """
+    Abre um arquivo .fvlm como um array estruturado mapeado em memória (somente leitura),
+    com os campos "t", "flags" e "landmarks". Se a gravação não foi fechada corretamente,
+    o número de frames é deduzido do tamanho do arquivo.
+    """
+    with open(path, "rb") as f:
+        magic, version, num_landmarks, frames = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or num_landmarks != NUM_LANDMARKS:
+        raise ValueError(f"Arquivo de landmarks inválido: {path}")
+    available = (os.path.getsize(path) - HEADER.size) // RECORD_DTYPE.itemsize
+    frames = available if frames == 0 else min(frames, available)
+    if frames == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(frames,))
+
+
+def iter_frames(recording):
+    """Percorre a gravação retornando (t, landmarks ou None) para cada frame."""
+    has_person = (recording["flags"] & FLAG_PERSON) != 0
+    landmarks = recording["landmarks"]
+    for i, t in enumerate(recording["t"].tolist()):
+        yield t, (landmarks[i] if has_person[i] else None)
@@ -0,0 +1,235 @@
+import collections
+import threading
+import time
+
+from frame_buffers import FrameBufferPool
+from profiling import NULL_PROFILER
+
+# --- Motor de sessão em pipeline (captura -> inferência -> renderização) ---
+
+
+class DropOldestQueue:
+    """
+    Fila limitada que descarta o item mais antigo quando está cheia.
+    Usada entre os estágios para que um estágio lento nunca acumule frames velhos.
+    """
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item, block=False):
+        """
+        Insere um item. Com block=False o item mais antigo é descartado se a fila
+        estiver cheia; com block=True espera por espaço (útil para arquivos de vídeo).
+        Retorna o item descartado, ou None.
+        """
+        with self._cond:
+            if block:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+            dropped = None
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify_all()
+            return dropped
+
+    def get(self, timeout=None):
+        """Retorna o item mais antigo, ou None se a fila foi fechada ou o timeout expirou."""
+        with self._cond:
+            end = None if timeout is None else time.perf_counter() + timeout
+            while not self._items:
+                if self._closed:
+                    return None
+                remaining = None if end is None else end - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FramePacket:
+    """Um frame em trânsito pelo pipeline, com os resultados de cada estágio."""
+    def __init__(self, index, frame, captured_at):
+        self.index = index
+        self.frame = frame
+        self.captured_at = captured_at
+        self.image = None
+        self.landmarks = None
+        self.person_detected = False
+        self.general_errors = []
+        self.reps = 0
+        self.feedback = ""
+        self.errors = []
+        self.latency_ms = None
+
+
+class CaptureThread(threading.Thread):
+    """
+    Lê a câmera continuamente e mantém apenas o frame mais recente na fila de saída.
+    Com realtime=False (arquivos de vídeo) nenhum frame é descartado.
+    Com `buffer_pool`, cada frame é lido em um buffer do pool, e os frames descartados
+    pela fila voltam para ele.
+    """
+    def __init__(self, cap, output_queue, realtime=True, profiler=NULL_PROFILER, buffer_pool=None):
+        super().__init__(name="fitvision-capture", daemon=True)
+        self.cap = cap
+        self.output_queue = output_queue
+        self.realtime = realtime
+        self.profiler = profiler
+        self.buffer_pool = buffer_pool
+        self.stop_event = threading.Event()
+        self.frames_read = 0
+
+    def run(self):
+        frame_shape = None
+        while not self.stop_event.is_set() and self.cap.isOpened():
+            started = self.profiler.now()
+            buffer = None
+            if self.buffer_pool is not None and frame_shape is not None:
+                buffer = self.buffer_pool.acquire(frame_shape)
+            ret, frame = self.cap.read(buffer)
+            self.profiler.record("capture", started)
+            if not ret:
+                print("Não foi possível receber o frame. Encerrando...")
+                break
+            frame_shape = frame.shape
+            packet = FramePacket(self.frames_read, frame, time.perf_counter())
+            self.frames_read += 1
+            dropped = self.output_queue.put(packet, block=not self.realtime)
+            if dropped is not None and self.buffer_pool is not None:
+                self.buffer_pool.release(dropped.frame)
+        self.output_queue.close()
+
+
+class InferenceThread(threading.Thread):
+    """
+    Executa o estágio de inferência (pose + lógica do exercício) sobre os frames capturados.
+    Por ser uma única thread consumindo frames em ordem crescente de índice, a contagem
+    de repetições das subclasses de BaseExercise acontece estritamente na ordem dos frames.
+    """
+    def __init__(self, infer_fn, input_queue, output_queue, realtime=True, buffer_pool=None):
+        super().__init__(name="fitvision-inference", daemon=True)
+        self.infer_fn = infer_fn
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.realtime = realtime
+        self.buffer_pool = buffer_pool
+        self.stop_event = threading.Event()
+        self.last_index = -1
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                packet = self.input_queue.get(timeout=0.1)
+                if packet is None:
+                    if self.input_queue.closed:
+                        break
+                    continue
+                if packet.index <= self.last_index:
+                    # Nunca processa um frame mais antigo que o último (ordem estrita)
+                    self._release(packet)
+                    continue
+                self.last_index = packet.index
+                self.infer_fn(packet)
+                self._release(self.output_queue.put(packet, block=not self.realtime))
+        except Exception as e:
+            self.error = e
+        finally:
+            self.output_queue.close()
+
+    def _release(self, packet):
+        if packet is not None and self.buffer_pool is not None:
+            self.buffer_pool.release(packet.frame)
+
+
+class SessionPipeline:
+    """
+    Liga captura, inferência e renderização por filas limitadas com descarte do mais antigo.
+    A renderização roda na thread que chama run(), pois o cv2.imshow precisa da thread principal.
+
+    Os frames circulam em buffers de um FrameBufferPool: o frame de um pacote volta ao
+    pool depois do render_fn (ou quando o pacote é descartado), então infer_fn e
+    render_fn não devem guardar referências a packet.frame após retornarem.
+    """
+    def __init__(self, cap, infer_fn, render_fn, realtime=True, latency_window=300, profiler=NULL_PROFILER):
+        self.buffer_pool = FrameBufferPool()
+        self.capture_queue = DropOldestQueue(maxsize=1)
+        self.render_queue = DropOldestQueue(maxsize=1 if realtime else 4)
+        self.capture = CaptureThread(cap, self.capture_queue, realtime, profiler, self.buffer_pool)
+        self.profiler = profiler
+        self.inference = InferenceThread(infer_fn, self.capture_queue, self.render_queue, realtime, self.buffer_pool)
+        self.render_fn = render_fn
+        self.latencies_ms = collections.deque(maxlen=latency_window)
+        self.frames_rendered = 0
+        self.first_frame_at = None  # perf_counter do primeiro frame renderizado
+
+    def run(self):
+        """Executa o pipeline até o render_fn retornar False ou a fonte de vídeo acabar."""
+        self.capture.start()
+        self.inference.start()
+        started_at = time.perf_counter()
+        try:
+            while True:
+                packet = self.render_queue.get(timeout=0.1)
+                if packet is None:
+                    if self.render_queue.closed:
+                        break
+                    continue
+                keep_running = self.render_fn(packet)
+                self.buffer_pool.release(packet.frame)
+                if self.first_frame_at is None:
+                    self.first_frame_at = time.perf_counter()
+                packet.latency_ms = (time.perf_counter() - packet.captured_at) * 1000.0
+                self.latencies_ms.append(packet.latency_ms)
+                self.profiler.record("end_to_end", int(packet.captured_at * 1e9))
+                self.frames_rendered += 1
+                if keep_running is False:
+                    break
+        finally:
+            self.stop()
+        if self.inference.error is not None:
+            raise self.inference.error
+        return self.stats(time.perf_counter() - started_at)
+
+    def stop(self):
+        self.capture.stop_event.set()
+        self.inference.stop_event.set()
+        self.capture_queue.close()
+        self.render_queue.close()
+        self.capture.join(timeout=1.0)
+        self.inference.join(timeout=1.0)
+
+    def stats(self, elapsed):
+        """Resumo da sessão: FPS renderizado, frames descartados e latência ponta a ponta."""
+        latencies = sorted(self.latencies_ms)
+        summary = {
+            "frames_captured": self.capture.frames_read,
+            "frames_rendered": self.frames_rendered,
+            "dropped_capture": self.capture_queue.dropped,
+            "dropped_render": self.render_queue.dropped,
+            "frame_buffers": self.buffer_pool.allocated,
+            "fps": self.frames_rendered / elapsed if elapsed > 0 else 0.0,
+            "latency_ms_mean": 0.0,
+            "latency_ms_p95": 0.0,
+        }
+        if latencies:
+            summary["latency_ms_mean"] = sum(latencies) / len(latencies)
+            summary["latency_ms_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return summary
@@ -0,0 +1,144 @@
+import json
+import math
+import time
+
+import numpy as np
+
+# --- Instrumentação por estágio do loop de frames ---
+
+
+class StageHistogram:
+    """
+    Histograma de tempos com memória fixa: faixas logarítmicas de 1 µs a 10 s
+    (`bins_per_decade` faixas por década), com percentis aproximados pelo limite
+    superior da faixa. Registrar uma amostra é O(1).
+    """
+    MIN_NS = 1_000
+    DECADES = 7
+
+    def __init__(self, bins_per_decade=40):
+        self.bins_per_decade = bins_per_decade
+        self.counts = np.zeros(self.DECADES * bins_per_decade + 2, dtype=np.int64)
+        self.total_ns = 0
+        self.count = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        if ns <= self.MIN_NS:
+            index = 0
+        else:
+            index = min(int(math.log10(ns / self.MIN_NS) * self.bins_per_decade) + 1, len(self.counts) - 1)
+        self.counts[index] += 1
+        self.total_ns += ns
+        self.count += 1
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q):
+        """Percentil `q` (0-100) em milissegundos."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(self.count * q / 100.0))
+        index = int(np.searchsorted(np.cumsum(self.counts), rank))
+        upper_ns = self.MIN_NS * 10 ** (index / self.bins_per_decade)
+        return min(upper_ns, self.max_ns) / 1e6
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class FrameProfiler:
+    """
+    Mede o tempo de cada estágio do loop de frames. Uso:
+
+        t = profiler.now()
+        ... estágio ...
+        t = profiler.record("pose", t)
+
+    Com enabled=False, now() e record() retornam 0 sem ler o relógio, então a
+    instrumentação pode ficar no caminho crítico com custo desprezível. Cada estágio
+    deve ser registrado sempre pela mesma thread.
+
+    Cada amostra vai para dois histogramas: o da sessão inteira (`histograms`, usado por
+    summary()) e o do intervalo atual de `export_every` segundos. A cada intervalo,
+    maybe_export() fecha o intervalo (e o exporta, se houver `export_path`);
+    recent_summary() mostra o último intervalo fechado, para que um pico atual não fique
+    diluído na sessão inteira.
+    """
+    def __init__(self, enabled=True, export_path=None, export_every=5.0):
+        self.enabled = enabled
+        self.export_path = export_path
+        self.export_every = export_every
+        self.histograms = {}
+        self.interval = {}
+        self.last_interval = {}
+        self._last_export = time.perf_counter()
+
+    def now(self):
+        return time.perf_counter_ns() if self.enabled else 0
+
+    def record(self, stage, started_ns):
+        """Registra o tempo desde `started_ns` no estágio e retorna o instante atual."""
+        if not self.enabled:
+            return 0
+        now = time.perf_counter_ns()
+        if not started_ns:
+            # O estágio começou com a instrumentação desligada (ligada pela tecla D em
+            # outra thread): não há início para medir
+            return now
+        elapsed = now - started_ns
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            histogram = self.histograms.setdefault(stage, StageHistogram())
+        histogram.record(elapsed)
+        # O dicionário do intervalo é trocado por maybe_export em outra thread: uma amostra
+        # registrada durante a troca pode cair no intervalo que acabou de fechar
+        interval = self.interval
+        histogram = interval.get(stage)
+        if histogram is None:
+            histogram = interval.setdefault(stage, StageHistogram())
+        histogram.record(elapsed)
+        return now
+
+    def summary(self):
+        """Percentis da sessão inteira."""
+        return {stage: histogram.summary() for stage, histogram in list(self.histograms.items())}
+
+    def recent_summary(self):
+        """Percentis do último intervalo fechado (ou do atual, antes do primeiro fechar)."""
+        histograms = self.last_interval or self.interval
+        return {stage: histogram.summary() for stage, histogram in list(histograms.items())}
+
+    def maybe_export(self):
+        """
+        A cada `export_every` segundos fecha o intervalo atual e, com `export_path`,
+        acrescenta em JSON lines os percentis do intervalo ("stages") e da sessão ("session").
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if now - self._last_export < self.export_every:
+            return
+        interval_seconds = now - self._last_export
+        self._last_export = now
+        self.last_interval, self.interval = self.interval, {}
+        if self.export_path is None:
+            return
+        with open(self.export_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "t": time.time(),
+                "interval_s": round(interval_seconds, 3),
+                "stages": {stage: h.summary() for stage, h in self.last_interval.items()},
+                "session": self.summary(),
+            }) + "\n")
+
+
+# Instância desligada usada quando nenhuma instrumentação é pedida
+NULL_PROFILER = FrameProfiler(enabled=False)
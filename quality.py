@@ -0,0 +1,483 @@
+import argparse
+import json
+import os
+import platform
+import threading
+import time
+
+# --- Qualidade da pose ajustada à máquina: complexidade do modelo e resolução de entrada ---
+#
+# Os níveis vão do mais caro (e preciso) ao mais barato. O modelo "full" (complexidade 1)
+# vem com o mediapipe; "lite" (0) e "heavy" (2) são baixados no primeiro uso e, sem rede,
+# ficam marcados como indisponíveis no perfil da máquina.
+QUALITY_LEVELS = (
+    (2, 320),
+    (1, 320),
+    (1, 256),
+    (0, 256),
+    (0, 192),
+    (0, 160),
+)
+DEFAULT_PROFILE_PATH = os.path.join(os.path.expanduser("~"), ".fitvision", "quality_profile.json")
+# Quanto um nível ainda não medido deve custar a mais que o atual, para decidir se cabe subir
+UNKNOWN_COST_RATIO = 2.0
+# Por quanto tempo (s) um modelo que falhou ao carregar não é tentado de novo; a falha
+# mais comum é o download do "lite"/"heavy" sem rede, que não deve valer para sempre
+UNAVAILABLE_RETRY_AFTER = 3600.0
+
+
+def machine_key():
+    """Identifica a máquina no arquivo de perfis: nome, arquitetura e número de núcleos."""
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}"
+
+
+def _mediapipe_version():
+    try:
+        from importlib.metadata import version
+        return version("mediapipe")
+    except Exception:
+        return None
+
+
+def load_profile(path=DEFAULT_PROFILE_PATH, key=None):
+    """Retorna o perfil salvo para a máquina, ou None se não houver."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            profiles = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return profiles.get(key or machine_key())
+
+
+def save_profile(profile, path=DEFAULT_PROFILE_PATH, key=None):
+    """Grava o perfil da máquina, preservando os das outras máquinas no mesmo arquivo."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            profiles = json.load(f)
+    except (OSError, ValueError):
+        profiles = {}
+    profiles[key or machine_key()] = profile
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(profiles, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Erro ao salvar o perfil de qualidade: {e}")
+
+
+def profile_machine(pose_factory, frames, levels=QUALITY_LEVELS, warmup=2):
+    """
+    Mede o custo médio (ms) de pose.process em cada nível sobre os frames BGR dados.
+    Retorna (custos por nível, complexidades indisponíveis); o custo de um nível
+    indisponível é None.
+    """
+    from roi_tracker import RoiPoseEstimator
+
+    costs = [None] * len(levels)
+    unavailable = []
+    measured = frames[warmup:] or frames
+    for complexity in sorted({c for c, _ in levels}, reverse=True):
+        try:
+            pose = pose_factory(complexity)
+        except Exception as e:
+            print(f"Modelo de pose com complexidade {complexity} indisponível: {e}")
+            unavailable.append(complexity)
+            continue
+        try:
+            for index, (level_complexity, input_size) in enumerate(levels):
+                if level_complexity != complexity:
+                    continue
+                estimator = RoiPoseEstimator(pose, input_size=input_size)
+                for frame in frames[:warmup]:
+                    estimator.process(frame)
+                started_at = time.perf_counter()
+                for frame in measured:
+                    estimator.process(frame)
+                costs[index] = (time.perf_counter() - started_at) / len(measured) * 1000.0
+        finally:
+            pose.close()
+    return costs, unavailable
+
+
+class QualityController:
+    """
+    Escolhe o nível de qualidade que cabe no orçamento de `target_fps` e de latência e o
+    reajusta durante a sessão, a partir do custo de cada inferência.
+
+    Histerese: desce um nível só quando o custo médio da inferência (ou a latência da
+    captura ao resultado) passa do orçamento por `downgrade_after` segundos seguidos, e
+    sobe só quando o custo conhecido do nível de cima cabe com folga (`upgrade_margin`)
+    por `upgrade_after` segundos. Depois de cada troca nada muda por `cooldown` segundos.
+    Custos medidos na sessão valem por `retry_after` segundos; depois disso volta a valer
+    o custo do perfil, e um nível recusado pode ser tentado de novo. Uma complexidade cujo
+    modelo falhou ao carregar fica indisponível por `unavailable_retry_after` segundos
+    (também entre sessões, pelo perfil salvo) e depois volta a ser tentada.
+
+    Os Pose de cada complexidade são criados por `pose_factory(complexidade)` e mantidos
+    até close(), para que voltar a um nível não recarregue o modelo. Os das complexidades
+    vizinhas à atual são carregados em segundo plano por preload(); uma troca para um
+    nível cujo Pose ainda não está pronto espera o carregamento, e a sessão continua no
+    nível atual enquanto isso.
+    """
+    def __init__(self, pose_factory, target_fps=30, latency_budget_ms=200, levels=QUALITY_LEVELS, level=None,
+                 costs_ms=None, unavailable=(), inference_share=0.8, smoothing=0.1, warmup=2,
+                 downgrade_after=1.0, upgrade_after=5.0, upgrade_margin=0.7, cooldown=3.0, retry_after=60.0,
+                 unavailable_retry_after=UNAVAILABLE_RETRY_AFTER, profile_path=None):
+        self.pose_factory = pose_factory
+        self.target_fps = target_fps
+        self.levels = tuple(tuple(level) for level in levels)
+        self.inference_budget = inference_share / target_fps
+        self.latency_budget = latency_budget_ms / 1000.0
+        self.smoothing = smoothing
+        self.warmup = warmup
+        self.downgrade_after = downgrade_after
+        self.upgrade_after = upgrade_after
+        self.upgrade_margin = upgrade_margin
+        self.cooldown = cooldown
+        self.retry_after = retry_after
+        self.unavailable_retry_after = unavailable_retry_after
+        self.profile_path = profile_path
+
+        self.costs_ms = list(costs_ms) if costs_ms is not None else [None] * len(self.levels)
+        # complexidade -> instante (time.time) da falha; sem instante, conta a partir de agora
+        if isinstance(unavailable, dict):
+            self.unavailable = dict(unavailable)
+        else:
+            self.unavailable = dict.fromkeys(unavailable, time.time())
+        self.level = level if level is not None else self.pick_level()
+        self.switches = 0
+        self._poses = {}
+        self._poses_lock = threading.Lock()
+        self._loading = set()
+        self._loaders = []
+        self._closed = False
+        self._live_costs = {}  # nível -> (custo em segundos, instante da medida)
+        self._restart(None)
+
+    def _restart(self, now):
+        self._warmup_left = self.warmup
+        self._cost = None
+        self._latency = None
+        self._over_since = None
+        self._under_since = None
+        self._changed_at = now
+
+    @property
+    def model_complexity(self):
+        return self.levels[self.level][0]
+
+    @property
+    def input_size(self):
+        return self.levels[self.level][1]
+
+    def _mark_unavailable(self, complexity):
+        self.unavailable[complexity] = time.time()
+
+    def _is_unavailable(self, complexity):
+        failed_at = self.unavailable.get(complexity)
+        if failed_at is None:
+            return False
+        if time.time() - failed_at < self.unavailable_retry_after:
+            return True
+        # Expirou: o modelo volta a ser tentado (ex.: a rede voltou e o download funciona)
+        self.unavailable.pop(complexity, None)
+        return False
+
+    def _available(self, index):
+        return not self._is_unavailable(self.levels[index][0])
+
+    def pick_level(self):
+        """Melhor nível disponível cujo custo do perfil cabe no orçamento com folga."""
+        available = [i for i in range(len(self.levels)) if self._available(i)]
+        for index in available:
+            cost = self.costs_ms[index]
+            if cost is not None and cost / 1000.0 <= self.inference_budget * self.upgrade_margin:
+                return index
+        measured = [i for i in available if self.costs_ms[i] is not None]
+        if measured:
+            return measured[-1]
+        # Sem perfil: começa no modelo que vem com o mediapipe
+        return next((i for i in available if self.levels[i][0] == 1), available[0] if available else 0)
+
+    @property
+    def pose(self):
+        """Pose do nível atual (criado na primeira vez; se o modelo falhar, o nível é evitado)."""
+        complexity = self.model_complexity
+        with self._poses_lock:
+            pose = self._poses.get(complexity)
+        if pose is None:
+            try:
+                pose = self.pose_factory(complexity)
+            except Exception as e:
+                print(f"Modelo de pose com complexidade {complexity} indisponível: {e}")
+                self._mark_unavailable(complexity)
+                fallback = self._step(1) if self._step(1) is not None else self._step(-1)
+                if fallback is None:
+                    raise
+                self.level = fallback
+                return self.pose
+            with self._poses_lock:
+                # Pode ter sido carregado em segundo plano enquanto isso
+                if complexity in self._poses:
+                    pose.close()
+                    pose = self._poses[complexity]
+                else:
+                    self._poses[complexity] = pose
+        return pose
+
+    def _neighbour_complexities(self):
+        """Complexidades dos níveis disponíveis mais próximos, acima e abaixo, com modelo diferente do atual."""
+        current = self.model_complexity
+        neighbours = []
+        for direction in (1, -1):
+            index = self.level + direction
+            while 0 <= index < len(self.levels):
+                complexity = self.levels[index][0]
+                if self._available(index) and complexity != current:
+                    neighbours.append(complexity)
+                    break
+                index += direction
+        return neighbours
+
+    def preload(self, complexities=None):
+        """
+        Carrega em uma thread de fundo os Pose das `complexities` dadas (por padrão, as
+        vizinhas à atual), para que uma troca de nível não pare a inferência esperando o
+        grafo ou o download do modelo. Não bloqueia; complexidades já carregadas são ignoradas.
+        """
+        if complexities is None:
+            complexities = self._neighbour_complexities()
+        with self._poses_lock:
+            if self._closed:
+                return
+            missing = [c for c in complexities
+                       if c not in self._poses and c not in self._loading and not self._is_unavailable(c)]
+            if not missing:
+                return
+            self._loading.update(missing)
+            loader = threading.Thread(target=self._load_poses, args=(missing,), name="fitvision-pose-preload",
+                                      daemon=True)
+            self._loaders = [t for t in self._loaders if t.is_alive()] + [loader]
+        loader.start()
+
+    def _load_poses(self, complexities):
+        for complexity in complexities:
+            try:
+                pose = self.pose_factory(complexity)
+            except Exception as e:
+                print(f"Modelo de pose com complexidade {complexity} indisponível: {e}")
+                self._mark_unavailable(complexity)
+                pose = None
+            with self._poses_lock:
+                self._loading.discard(complexity)
+                if pose is None:
+                    continue
+                if self._closed or complexity in self._poses:
+                    pose.close()
+                else:
+                    self._poses[complexity] = pose
+
+    def ready(self, index):
+        """Indica se o Pose do nível `index` já está carregado."""
+        with self._poses_lock:
+            return self.levels[index][0] in self._poses
+
+    def _step(self, direction):
+        """Próximo nível disponível acima (-1) ou abaixo (+1) do atual, ou None."""
+        index = self.level + direction
+        while 0 <= index < len(self.levels):
+            if self._available(index):
+                return index
+            index += direction
+        return None
+
+    def _known_cost(self, index, now):
+        live = self._live_costs.get(index)
+        if live is not None and now - live[1] < self.retry_after:
+            return live[0]
+        cost = self.costs_ms[index]
+        return cost / 1000.0 if cost is not None else None
+
+    def observe(self, inference_seconds, latency_seconds=None, now=None):
+        """
+        Registra o custo de uma inferência (e a latência da captura até o resultado).
+        Retorna True quando o nível mudou: o chamador deve então usar `pose` e `input_size`.
+        """
+        if self._warmup_left > 0:
+            # As primeiras inferências de um modelo incluem a inicialização do grafo
+            self._warmup_left -= 1
+            return False
+        now = time.perf_counter() if now is None else now
+        if self._cost is None:
+            self._cost = inference_seconds
+        else:
+            self._cost += self.smoothing * (inference_seconds - self._cost)
+        if latency_seconds is not None:
+            if self._latency is None:
+                self._latency = latency_seconds
+            else:
+                self._latency += self.smoothing * (latency_seconds - self._latency)
+        self._live_costs[self.level] = (self._cost, now)
+
+        if self._changed_at is not None and now - self._changed_at < self.cooldown:
+            return False
+
+        over = self._cost > self.inference_budget or (self._latency is not None and self._latency > self.latency_budget)
+        if over:
+            self._under_since = None
+            if self._over_since is None:
+                self._over_since = now
+            lower = self._step(1)
+            if lower is not None and now - self._over_since >= self.downgrade_after:
+                return self._switch(lower, now)
+            return False
+
+        self._over_since = None
+        upper = self._step(-1)
+        if upper is None:
+            return False
+        cost = self._known_cost(upper, now)
+        if cost is None:
+            cost = self._cost * UNKNOWN_COST_RATIO
+        if cost > self.inference_budget * self.upgrade_margin:
+            self._under_since = None
+            return False
+        if self._under_since is None:
+            self._under_since = now
+        if now - self._under_since >= self.upgrade_after:
+            return self._switch(upper, now)
+        return False
+
+    def _switch(self, index, now):
+        if not self.ready(index):
+            # O modelo do novo nível ainda carrega em segundo plano: fica no atual por
+            # enquanto (a condição da troca continua valendo e é reavaliada a cada inferência)
+            self.preload([self.levels[index][0]])
+            return False
+        self.level = index
+        self.switches += 1
+        self._restart(now)
+        self.preload()
+        return True
+
+    def stats(self):
+        return {
+            "level": self.level,
+            "model_complexity": self.model_complexity,
+            "input_size": self.input_size,
+            "switches": self.switches,
+            "inference_ms": (self._cost or 0.0) * 1000.0,
+            "latency_ms": (self._latency or 0.0) * 1000.0,
+        }
+
+    def save(self):
+        """Grava o nível atual e os custos medidos no perfil da máquina (se houver profile_path)."""
+        if self.profile_path is None:
+            return
+        costs_ms = list(self.costs_ms)
+        for index, (cost, _) in self._live_costs.items():
+            costs_ms[index] = cost * 1000.0
+        save_profile({
+            "levels": [list(level) for level in self.levels],
+            "level": self.level,
+            "costs_ms": costs_ms,
+            # Com o instante da falha, para que a próxima sessão tente de novo depois de expirar
+            "unavailable": {str(c): failed_at for c, failed_at in sorted(dict(self.unavailable).items())},
+            "target_fps": self.target_fps,
+            "mediapipe": _mediapipe_version(),
+            "updated_at": time.time(),
+        }, self.profile_path)
+
+    def close(self):
+        with self._poses_lock:
+            self._closed = True
+            loaders = self._loaders
+        for loader in loaders:
+            loader.join()
+        with self._poses_lock:
+            poses, self._poses = self._poses, {}
+        for pose in poses.values():
+            pose.close()
+
+
+def _profile_unavailable(profile):
+    """Complexidades indisponíveis do perfil salvo ({complexidade: instante da falha})."""
+    unavailable = profile.get("unavailable")
+    if not isinstance(unavailable, dict):
+        # Perfis antigos guardavam só a lista, sem o instante: tenta de novo
+        return {}
+    return {int(c): failed_at for c, failed_at in unavailable.items()}
+
+
+def create_quality_controller(pose_factory, sample_frames, target_fps=30, latency_budget_ms=200,
+                              profile_path=DEFAULT_PROFILE_PATH, reprofile=False):
+    """
+    Cria o controlador a partir do perfil salvo desta máquina. Sem perfil compatível (ou
+    com reprofile=True), mede os níveis com os frames de `sample_frames()` e salva o perfil,
+    de forma que só a primeira abertura em cada máquina pague a medição.
+    """
+    profile = None if reprofile or profile_path is None else load_profile(profile_path)
+    if profile is not None and (
+        [tuple(level) for level in profile.get("levels", [])] != list(QUALITY_LEVELS)
+        or profile.get("mediapipe") != _mediapipe_version()
+    ):
+        profile = None
+
+    if profile is None:
+        frames = sample_frames()
+        if not frames:
+            # Sem frames (câmera ainda desconectada) não há o que medir: a sessão ajusta sozinha
+            return QualityController(pose_factory, target_fps, latency_budget_ms, profile_path=profile_path)
+        costs_ms, unavailable = profile_machine(pose_factory, frames)
+        controller = QualityController(
+            pose_factory, target_fps, latency_budget_ms, costs_ms=costs_ms, unavailable=unavailable,
+            profile_path=profile_path,
+        )
+        controller.save()
+        return controller
+
+    # O nível salvo foi escolhido para o target_fps daquela sessão; com outro alvo, recalcula
+    level = profile["level"] if profile.get("target_fps") == target_fps else None
+    return QualityController(
+        pose_factory, target_fps, latency_budget_ms, level=level, costs_ms=profile["costs_ms"],
+        unavailable=_profile_unavailable(profile), profile_path=profile_path,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mede e mostra o perfil de qualidade da pose desta máquina.")
+    parser.add_argument("--video", default=None, help="Vídeo usado na medição (padrão: câmera 0).")
+    parser.add_argument("--target-fps", type=int, default=30)
+    parser.add_argument("--frames", type=int, default=12, help="Frames medidos por nível.")
+    parser.add_argument("--profile-path", default=DEFAULT_PROFILE_PATH)
+    args = parser.parse_args(argv)
+
+    import vision_controller
+
+    cap = vision_controller.open_camera(args.video if args.video is not None else 0)
+    if cap is None:
+        return
+    try:
+        controller = create_quality_controller(
+            vision_controller.create_pose, lambda: vision_controller.read_sample_frames(cap, args.frames),
+            target_fps=args.target_fps, profile_path=args.profile_path, reprofile=True,
+        )
+    finally:
+        cap.release()
+    print(json.dumps({
+        "machine": machine_key(),
+        "levels": [
+            {"model_complexity": c, "input_size": s,
+             "cost_ms": round(cost, 2) if cost is not None else None}
+            for (c, s), cost in zip(controller.levels, controller.costs_ms)
+        ],
+        "unavailable": sorted(controller.unavailable),
+        "chosen": controller.stats(),
+        "profile_path": args.profile_path,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import collections
+import math
+
+import numpy as np
+
+# --- Métricas por repetição com memória constante ---
+#
+# Os ângulos e instantes recentes ficam em buffers circulares de tamanho fixo; cada
+# repetição mantém só acumuladores (mínimo, máximo, instantes das fases, pico de
+# velocidade, contagem de erros), atualizados em O(1) por frame. Ao completar uma
+# repetição, as métricas viram um evento e os acumuladores recomeçam.
+#
+# A configuração vem da chave "analytics" de EXERCISE_RULES:
+#   "angle":         ângulo que descreve o movimento (ex.: "knee_angle")
+#   "turning_point": "min" se o ângulo fecha e volta a abrir (agachamento, rosca),
+#                    "max" se abre e volta a fechar (polichinelo)
+#   "eccentric":     "before" se a fase excêntrica vem antes do ponto de virada,
+#                    "after" se vem depois
+
+
+class RepAnalytics:
+    """
+    Acompanha o ângulo principal de um exercício e emite, a cada repetição completa, um
+    dicionário com duração, tempos excêntrico/concêntrico, ângulos mínimo e máximo,
+    amplitude, velocidades angulares e quantos frames tiveram cada erro.
+    """
+    def __init__(self, angle_names, angle, turning_point="min", eccentric="before",
+                 capacity=128, velocity_window=3, rest_tolerance=5.0, max_events=32):
+        self.angle_names = list(angle_names)
+        self.angle = angle
+        self._primary = self.angle_names.index(angle)
+        # Com o ponto de virada no máximo, o ângulo é negado e o resto do código é o mesmo
+        self._sign = 1.0 if turning_point == "min" else -1.0
+        self._eccentric_first = eccentric == "before"
+        self.capacity = capacity
+        self.velocity_window = velocity_window
+        self.rest_tolerance = rest_tolerance
+
+        # Buffers circulares dos frames recentes
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.angles = np.zeros((capacity, len(self.angle_names)), dtype=np.float32)
+        self._primary_ring = [0.0] * capacity  # cópia em float do ângulo principal, sem custo de indexação
+        self._head = 0
+        self.count = 0
+
+        self.events = collections.deque(maxlen=max_events)
+        self.last_event = None
+        # Acumuladores da sessão inteira (sobrevivem ao reset)
+        self._totals = {"reps": 0, "duration": 0.0, "eccentric_time": 0.0, "concentric_time": 0.0,
+                        "range_of_motion": 0.0, "peak_velocity": 0.0}
+        self._begin_rep(None, None)
+
+    def _begin_rep(self, t, value):
+        """Zera os acumuladores da repetição; `value` é o ângulo já com o sinal aplicado."""
+        self._frames = 0
+        self._rest_value = value if value is not None else -math.inf
+        self._rest_t = t
+        self._start_t = t
+        self._turn_value = math.inf
+        self._turn_t = None
+        self._low = math.inf
+        self._high = -math.inf
+        self._peak_velocity = 0.0
+        self._error_frames = {}
+
+    def update(self, t, angles, errors, rep_completed, rep_number=None):
+        """Registra um frame. Retorna o evento da repetição quando `rep_completed`, senão None."""
+        i = self._head
+        self.times[i] = t
+        self.angles[i] = angles
+        value = float(angles[self._primary])
+        self._primary_ring[i] = value
+        self._head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+        if self.count > self.velocity_window:
+            j = (i - self.velocity_window) % self.capacity
+            dt = t - self.times[j]
+            if dt > 0:
+                velocity = abs(value - self._primary_ring[j]) / dt
+                if velocity > self._peak_velocity:
+                    self._peak_velocity = velocity
+
+        if value < self._low:
+            self._low = value
+        if value > self._high:
+            self._high = value
+
+        # Início do movimento: último frame perto da posição de repouso antes do ponto de virada
+        signed = self._sign * value
+        if self._start_t is None:
+            self._start_t = self._rest_t = t
+        if signed >= self._rest_value - self.rest_tolerance:
+            self._rest_t = t
+            if signed > self._rest_value:
+                self._rest_value = signed
+        if signed < self._turn_value:
+            self._turn_value = signed
+            self._turn_t = t
+            self._start_t = self._rest_t
+
+        for error in errors:
+            self._error_frames[error] = self._error_frames.get(error, 0) + 1
+        self._frames += 1
+
+        if not rep_completed:
+            return None
+        event = self._finish_rep(t, rep_number)
+        self._begin_rep(t, signed)
+        return event
+
+    def _finish_rep(self, t, rep_number):
+        turn_t = self._turn_t if self._turn_t is not None else t
+        first = max(turn_t - self._start_t, 0.0)
+        second = max(t - turn_t, 0.0)
+        duration = first + second
+        eccentric, concentric = (first, second) if self._eccentric_first else (second, first)
+        range_of_motion = self._high - self._low
+        totals = self._totals
+        totals["reps"] += 1
+        totals["duration"] += duration
+        totals["eccentric_time"] += eccentric
+        totals["concentric_time"] += concentric
+        totals["range_of_motion"] += range_of_motion
+        totals["peak_velocity"] = max(totals["peak_velocity"], self._peak_velocity)
+        event = {
+            "rep": rep_number if rep_number is not None else totals["reps"],
+            "t": round(t, 3),
+            "duration": round(duration, 3),
+            "eccentric_time": round(eccentric, 3),
+            "concentric_time": round(concentric, 3),
+            "angle": self.angle,
+            "min_angle": round(self._low, 1),
+            "max_angle": round(self._high, 1),
+            "range_of_motion": round(range_of_motion, 1),
+            "peak_velocity": round(self._peak_velocity, 1),
+            "mean_concentric_velocity": round(range_of_motion / concentric, 1) if concentric > 0 else 0.0,
+            "frames": self._frames,
+            "error_frames": dict(self._error_frames),
+        }
+        self.events.append(event)
+        self.last_event = event
+        return event
+
+    def pop_events(self):
+        """Retorna e descarta os eventos ainda não lidos (no máximo `max_events`)."""
+        events = list(self.events)
+        self.events.clear()
+        return events
+
+    def recent(self, n=None):
+        """Últimos `n` frames do buffer, em ordem cronológica: (instantes, ângulos)."""
+        n = self.count if n is None else min(n, self.count)
+        index = (self._head - n + np.arange(n)) % self.capacity
+        return self.times[index], self.angles[index]
+
+    def reset(self):
+        """Descarta a repetição em andamento e o histórico recente (a pessoa saiu do quadro)."""
+        self._head = 0
+        self.count = 0
+        self._begin_rep(None, None)
+
+    def summary(self):
+        """Médias da sessão sobre as repetições completas."""
+        totals = self._totals
+        reps = totals["reps"]
+        if not reps:
+            return {"reps": 0}
+        return {
+            "reps": reps,
+            "mean_duration": round(totals["duration"] / reps, 3),
+            "mean_eccentric_time": round(totals["eccentric_time"] / reps, 3),
+            "mean_concentric_time": round(totals["concentric_time"] / reps, 3),
+            "mean_range_of_motion": round(totals["range_of_motion"] / reps, 1),
+            "peak_velocity": round(totals["peak_velocity"], 1),
+        }
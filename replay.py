@@ -0,0 +1,130 @@
+"""
+Reavalia gravações de landmarks (.fvlm) sem rodar o MediaPipe.
+
+    python replay.py sessao.fvlm --exercise squat --level medium
+    python replay.py sessao.fvlm --exercise squat --level medium --set knee_angle_down=95
+    python replay.py sessao.fvlm --exercise squat --all-levels
+
+Com --set, a mesma gravação é avaliada com os limiares do nível (A) e com os
+limiares alterados (B), para comparar o efeito de um ajuste em level_thresholds.
+Com --all-levels, a série é pontuada em todos os níveis em uma única passada.
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from exercises import get_exercise_instance, get_multi_level_engine, level_thresholds
+from landmark_recording import iter_frames, load_recording
+from vision_controller import MIN_LANDMARK_VISIBILITY, analyze_pose
+
+
+def replay(recording, exercise_name, level, overrides=None, min_visibility=MIN_LANDMARK_VISIBILITY):
+    """
+    Passa todos os frames da gravação pela classe do exercício, como na sessão ao vivo.
+    Retorna as repetições, o instante e as métricas de cada repetição e a taxa de frames/s.
+    Frames com articulações do exercício abaixo de `min_visibility` são ignorados
+    (min_visibility=0 avalia todos).
+    """
+    exercise = get_exercise_instance(exercise_name, level)
+    if overrides:
+        # Copia para não alterar o dicionário global level_thresholds
+        exercise.thresholds = dict(exercise.thresholds, **overrides)
+    rep_times = []
+    rep_metrics = []
+    error_frames = 0
+    started_at = time.perf_counter()
+    for t, landmarks in iter_frames(recording):
+        reps_before = exercise.reps
+        _, _, general_errors = analyze_pose(exercise, landmarks, t, min_visibility)
+        if exercise.reps > reps_before:
+            rep_times.append(round(t, 3))
+            rep_metrics.append(exercise.last_rep)
+        if general_errors or exercise.errors:
+            error_frames += 1
+    elapsed = time.perf_counter() - started_at
+    return {
+        "exercise": exercise_name,
+        "level": level,
+        "thresholds": exercise.thresholds,
+        "frames": len(recording),
+        # A contagem volta a zero quando a pessoa sai do quadro, como na sessão ao vivo
+        "reps": len(rep_times),
+        "reps_at_end": exercise.reps,
+        "rep_times": rep_times,
+        "rep_metrics": rep_metrics,
+        "rep_analytics": exercise.analytics.summary(),
+        "error_frames": error_frames,
+        "fps": round(len(recording) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def replay_levels(recording, exercise_name, threshold_sets=None, min_visibility=MIN_LANDMARK_VISIBILITY):
+    """
+    Pontua a gravação em vários conjuntos de limiares (padrão: todos os níveis) de uma
+    vez: os ângulos de cada frame são calculados uma única vez para todos os níveis.
+    """
+    engine = get_multi_level_engine(exercise_name, threshold_sets=threshold_sets)
+    rep_counts = np.zeros(engine.columns, dtype=np.int64)
+    error_frames = np.zeros(engine.columns, dtype=np.int64)
+    started_at = time.perf_counter()
+    for t, landmarks in iter_frames(recording):
+        reps_before = engine.reps.copy()
+        _, _, general_errors = analyze_pose(engine, landmarks, t, min_visibility)
+        rep_counts += engine.reps > reps_before
+        for column in range(engine.columns):
+            if general_errors or engine.errors(column):
+                error_frames[column] += 1
+    elapsed = time.perf_counter() - started_at
+    return {
+        "exercise": exercise_name,
+        "frames": len(recording),
+        "levels": {
+            label: {"reps": int(rep_counts[column]), "reps_at_end": int(engine.reps[column]),
+                    "error_frames": int(error_frames[column])}
+            for column, label in enumerate(engine.labels)
+        },
+        "fps": round(len(recording) / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+def _parse_override(text):
+    key, _, value = text.partition("=")
+    if not key or not value:
+        raise argparse.ArgumentTypeError(f"Use chave=valor, recebido: {text}")
+    if value.lower() in ("true", "false"):
+        return key, value.lower() == "true"
+    return key, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reavalia gravações de landmarks do FitVision.")
+    parser.add_argument("recordings", nargs="+", help="Arquivos .fvlm.")
+    parser.add_argument("--exercise", required=True, choices=sorted(level_thresholds))
+    parser.add_argument("--level", choices=["beginner", "medium", "advanced"])
+    parser.add_argument("--all-levels", action="store_true",
+                        help="Pontua a gravação em todos os níveis em uma única passada.")
+    parser.add_argument("--min-visibility", type=float, default=MIN_LANDMARK_VISIBILITY,
+                        help="Visibilidade mínima das articulações do exercício (0 avalia todos os frames).")
+    parser.add_argument("--set", dest="overrides", action="append", type=_parse_override, default=[],
+                        help="Altera um limiar do nível (ex.: knee_angle_down=95). Pode repetir.")
+    args = parser.parse_args(argv)
+    if not args.all_levels and args.level is None:
+        parser.error("informe --level ou --all-levels")
+
+    overrides = dict(args.overrides)
+    for path in args.recordings:
+        recording = load_recording(path)
+        if args.all_levels:
+            levels = replay_levels(recording, args.exercise, min_visibility=args.min_visibility)
+            print(json.dumps({"file": path, **levels}, ensure_ascii=False))
+            continue
+        result = {"file": path, "A": replay(recording, args.exercise, args.level, min_visibility=args.min_visibility)}
+        if overrides:
+            result["B"] = replay(recording, args.exercise, args.level, overrides, args.min_visibility)
+        print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
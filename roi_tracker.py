@@ -0,0 +1,132 @@
+import cv2
+import numpy as np
+
+from frame_buffers import ScratchBuffer
+from profiling import NULL_PROFILER
+from utils import landmarks_to_array
+
+# --- Inferência de pose em uma região de interesse (ROI) reduzida ---
+
+# Permutação que troca os landmarks esquerdos pelos direitos. Ao espelhar as coordenadas
+# é preciso trocar também os rótulos, pois o modelo rotula o lado anatômico da pessoa.
+MIRROR_PERMUTATION = np.array([
+    0, 4, 5, 6, 1, 2, 3, 8, 7, 10, 9,
+    12, 11, 14, 13, 16, 15, 18, 17, 20, 19, 22, 21,
+    24, 23, 26, 25, 28, 27, 30, 29, 32, 31,
+])
+
+
+class RoiPoseEstimator:
+    """
+    Executa o MediaPipe Pose sobre um recorte reduzido do frame da câmera em vez do
+    frame redimensionado para a tela.
+
+    A ROI é a caixa dos landmarks do frame anterior, expandida por `margin`. Enquanto
+    a pessoa continuar dentro da ROI atual ela não é movida, o que mantém a imagem
+    estável para o rastreamento interno do MediaPipe. Quando a pose é perdida, a busca
+    volta para o frame inteiro. O recorte é reduzido para que o maior lado tenha no
+    máximo `input_size` pixels antes da conversão BGR->RGB.
+
+    Os landmarks retornados estão normalizados em relação ao frame inteiro (e
+    espelhados se mirror=True). Como a tela é apenas um redimensionamento (e espelhamento)
+    do frame da câmera, essas coordenadas são as mesmas da tela, e os limiares de
+    level_thresholds continuam valendo sem alteração.
+    """
+    def __init__(self, pose, input_size=320, margin=0.25, min_visibility=0.3, mirror=True, profiler=NULL_PROFILER):
+        self.pose = pose
+        self.profiler = profiler
+        self.input_size = input_size
+        self.margin = margin
+        self.min_visibility = min_visibility
+        self.mirror = mirror
+        self.roi = None  # (x0, y0, x1, y1) em pixels do frame da câmera
+        self._landmarks = np.empty((33, 4), dtype=np.float32)
+        # Saídas do redimensionamento e da conversão de cor, reaproveitadas entre frames
+        self._resized = ScratchBuffer()
+        self._rgb = ScratchBuffer()
+
+    def reset(self):
+        """Descarta a ROI atual; o próximo frame volta a buscar no frame inteiro."""
+        self.roi = None
+
+    def prepare(self, frame):
+        """
+        Recorta a ROI atual, reduz e converte para RGB em buffers reaproveitados.
+        Retorna (imagem RGB, x0, y0, largura e altura do recorte); a imagem é
+        sobrescrita na chamada seguinte.
+        """
+        frame_h, frame_w = frame.shape[:2]
+        x0, y0, x1, y1 = self.roi if self.roi is not None else (0, 0, frame_w, frame_h)
+        crop = frame[y0:y1, x0:x1]
+        crop_w, crop_h = x1 - x0, y1 - y0
+
+        scale = self.input_size / max(crop_w, crop_h)
+        if scale < 1.0:
+            size = (max(1, int(crop_w * scale)), max(1, int(crop_h * scale)))
+            crop = cv2.resize(crop, size, dst=self._resized.view((size[1], size[0], 3)), interpolation=cv2.INTER_AREA)
+        image = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=self._rgb.view(crop.shape))
+        image.flags.writeable = False
+        return image, x0, y0, crop_w, crop_h
+
+    def process(self, frame):
+        """
+        Roda a pose no recorte atual do frame BGR. Retorna o array (33, 4) de landmarks
+        em coordenadas normalizadas do frame inteiro, ou None se ninguém foi detectado.
+        O array retornado é reutilizado na chamada seguinte.
+        """
+        started = self.profiler.now()
+        frame_h, frame_w = frame.shape[:2]
+        image, x0, y0, crop_w, crop_h = self.prepare(frame)
+        started = self.profiler.record("preprocess", started)
+        results = self.pose.process(image)
+        self.profiler.record("pose", started)
+
+        if results.pose_landmarks is None:
+            self.roi = None
+            return None
+
+        landmarks = landmarks_to_array(results.pose_landmarks, out=self._landmarks)
+        if landmarks[:, 3].mean() < self.min_visibility:
+            # Detecção fraca: considera o rastreamento perdido
+            self.roi = None
+            return None
+
+        # Mapeia as coordenadas do recorte para o frame inteiro
+        landmarks[:, 0] = (x0 + landmarks[:, 0] * crop_w) / frame_w
+        landmarks[:, 1] = (y0 + landmarks[:, 1] * crop_h) / frame_h
+        landmarks[:, 2] *= crop_w / frame_w
+        self._update_roi(landmarks, frame_w, frame_h)
+        if self.mirror:
+            landmarks[:, 0] = 1.0 - landmarks[:, 0]
+            landmarks[:] = landmarks[MIRROR_PERMUTATION]
+        return landmarks
+
+    def _update_roi(self, landmarks, frame_w, frame_h):
+        xs = landmarks[:, 0] * frame_w
+        ys = landmarks[:, 1] * frame_h
+        bx0, bx1 = xs.min(), xs.max()
+        by0, by1 = ys.min(), ys.max()
+
+        # Mantém a ROI atual enquanto a caixa da pessoa couber nela com folga
+        if self.roi is not None:
+            rx0, ry0, rx1, ry1 = self.roi
+            slack_x = (rx1 - rx0) * self.margin / (1 + 2 * self.margin) / 2
+            slack_y = (ry1 - ry0) * self.margin / (1 + 2 * self.margin) / 2
+            # Lados encostados na borda do frame não têm como crescer e não contam
+            inside = (
+                (rx0 <= 0 or bx0 >= rx0 + slack_x) and (rx1 >= frame_w or bx1 <= rx1 - slack_x)
+                and (ry0 <= 0 or by0 >= ry0 + slack_y) and (ry1 >= frame_h or by1 <= ry1 - slack_y)
+            )
+            if inside:
+                return
+
+        pad_x = (bx1 - bx0) * self.margin
+        pad_y = (by1 - by0) * self.margin
+        x0 = int(max(0, bx0 - pad_x))
+        y0 = int(max(0, by0 - pad_y))
+        x1 = int(min(frame_w, bx1 + pad_x))
+        y1 = int(min(frame_h, by1 + pad_y))
+        if x1 - x0 < 32 or y1 - y0 < 32:
+            self.roi = None
+        else:
+            self.roi = (x0, y0, x1, y1)
@@ -0,0 +1,268 @@
+import numpy as np
+
+from utils import calculate_angles, landmarks_to_array
+
+# --- Motor de regras dos exercícios, com vários conjuntos de limiares em paralelo ---
+#
+# Um exercício é descrito só por dados (veja EXERCISE_RULES em exercises.py):
+#   "angles":      {nome: (a, vértice, c)} ângulos medidos uma vez por frame
+#   "coords":      {nome: (índice do landmark, coluna)} coordenadas usadas pelas regras
+#   "derived":     {nome: função(v)} medidas derivadas, calculadas em ordem
+#   "defaults":    limiares que um nível pode omitir
+#   "stages":      estágios possíveis; "initial_stage" e "reset_stage"
+#   "transitions": regras {"stage", "when", "to", "rep", "feedback", "error"}; em cada
+#                  frame vale a primeira regra do estágio atual cuja condição é verdadeira
+#   "errors":      regras {"message", "when", "stage", "after_transition"}
+#   "latches":     {nome: {"stage", "value", "initial"}} valores guardados enquanto o
+#                  estágio inicial do frame for "stage"
+#   "near_transition": (ângulo, "<" ou ">", limiar) para o agendador de inferência
+#   "analytics":   ângulo e fases usados pelas métricas por repetição (rep_analytics.py)
+#
+# Os landmarks lidos pelas regras (vértices dos ângulos e "coords") formam
+# `required_joints`: analyze_pose só entrega ao motor frames em que todos estão visíveis.
+#
+# As condições recebem um dicionário `v` com as medidas do frame (escalares) e, para
+# cada coluna (nível), os limiares e os valores guardados (arrays). Como só usam
+# operadores do NumPy (&, |, ~, <, >), a mesma regra avalia todas as colunas de uma vez;
+# com uma única coluna, os limiares chegam como escalares do NumPy.
+#
+# O motor tem a mesma interface das classes de exercício (process_landmarks, reset),
+# então pode ser passado direto para analyze_pose.
+
+
+class RuleEngine:
+    """
+    Avalia as regras de um exercício para vários conjuntos de limiares ao mesmo tempo.
+    Os ângulos e medidas são calculados uma vez por frame; o estado de cada coluna
+    (estágio, repetições, feedback, erros e valores guardados) fica em arrays.
+    """
+    def __init__(self, rules, threshold_sets, labels=None):
+        self.rules = rules
+        self.labels = list(labels) if labels is not None else list(range(len(threshold_sets)))
+        self.columns = len(threshold_sets)
+
+        self.stages = list(rules["stages"])
+        self._triplets = np.array(list(rules["angles"].values()))
+        self._angle_names = list(rules["angles"])
+        self._coords = list(rules.get("coords", {}).items())
+        self.required_joints = np.unique(np.concatenate([
+            self._triplets.ravel(), [index for index, _ in rules.get("coords", {}).values()],
+        ])).astype(np.intp)
+        self._derived = list(rules.get("derived", {}).items())
+
+        # Transições com os índices dos estágios e do feedback já resolvidos
+        self.feedback_table = [""]
+        self.error_table = []
+        self._transitions = []
+        for rule in rules["transitions"]:
+            self._transitions.append((
+                self.stages.index(rule["stage"]),
+                rule["when"],
+                self.stages.index(rule["to"]) if "to" in rule else None,
+                rule.get("rep", False),
+                self._feedback_index(rule["feedback"]) if "feedback" in rule else None,
+                self._error_index(rule["error"]) if "error" in rule else None,
+            ))
+        self._transitions_by_stage = [
+            (stage, [t for t in self._transitions if t[0] == stage])
+            for stage in range(len(self.stages))
+        ]
+        self._errors_before = []
+        self._errors_after = []
+        for rule in rules.get("errors", []):
+            stage = self.stages.index(rule["stage"]) if rule.get("stage") else None
+            target = self._errors_after if rule.get("after_transition") else self._errors_before
+            target.append((self._error_index(rule["message"]), stage, rule["when"]))
+        # Os erros de transição ficam entre os "antes" e os "depois", como nas classes originais
+        self._error_order = (
+            [index for index, _, _ in self._errors_before]
+            + [t[5] for t in self._transitions if t[5] is not None]
+            + [index for index, _, _ in self._errors_after]
+        )
+        self._latches = [
+            (name, self.stages.index(latch["stage"]), latch["value"], latch.get("initial", 0.0))
+            for name, latch in rules.get("latches", {}).items()
+        ]
+
+        self.threshold_sets = [None] * self.columns
+        self._thresholds = {}
+        for column, thresholds in enumerate(threshold_sets):
+            self.set_thresholds(column, thresholds)
+
+        self.stage = np.full(self.columns, self.stages.index(rules["initial_stage"]), dtype=np.int8)
+        self.reps = np.zeros(self.columns, dtype=np.int64)
+        self.feedback = np.zeros(self.columns, dtype=np.int16)
+        self._error_mask = np.zeros((self.columns, len(self.error_table)), dtype=bool)
+        self.latches = {name: np.full(self.columns, initial, dtype=np.float32) for name, _, _, initial in self._latches}
+        self.last_angles = None
+        self._error_lists = [[] for _ in range(self.columns)]
+
+        # Valores vistos pelas condições: arrays por coluna, ou escalares com uma só coluna
+        self._array_values = dict(self._thresholds, **self.latches)
+        self._scalar_values = {key: values[0] for key, values in self._thresholds.items()}
+
+    def _feedback_index(self, text):
+        if text not in self.feedback_table:
+            self.feedback_table.append(text)
+        return self.feedback_table.index(text)
+
+    def _error_index(self, message):
+        if message not in self.error_table:
+            self.error_table.append(message)
+        return self.error_table.index(message)
+
+    def set_thresholds(self, column, thresholds):
+        """Troca os limiares de uma coluna (os ausentes vêm de "defaults")."""
+        thresholds = dict(self.rules.get("defaults", {}), **thresholds)
+        self.threshold_sets[column] = thresholds
+        for key, value in thresholds.items():
+            if key not in self._thresholds:
+                dtype = bool if isinstance(value, bool) else np.float32
+                self._thresholds[key] = np.zeros(self.columns, dtype=dtype)
+            self._thresholds[key][column] = value
+        if column == 0 and hasattr(self, "_scalar_values"):
+            self._scalar_values.update((key, values[0]) for key, values in self._thresholds.items())
+
+    def process_landmarks(self, landmarks, timestamp=None):
+        """
+        Avança o estado de todas as colunas com os landmarks de um frame. `timestamp` faz
+        parte da interface comum com os exercícios e não é usado pelo motor.
+        """
+        landmarks = landmarks_to_array(landmarks)
+        angles = calculate_angles(landmarks, self._triplets)
+        self.last_angles = angles
+
+        single = self.columns == 1
+        v = self._scalar_values if single else self._array_values
+        if single:
+            for name, latch in self.latches.items():
+                v[name] = latch[0]
+        for name, angle in zip(self._angle_names, angles):
+            v[name] = angle
+        for name, (index, column) in self._coords:
+            v[name] = landmarks[index, column]
+        for name, compute in self._derived:
+            v[name] = compute(v)
+
+        if single:
+            self._advance_single(v)
+        else:
+            self._advance_columns(v)
+            self._error_lists = [None] * self.columns
+
+    def _advance_columns(self, v):
+        """Avança todas as colunas com operações vetorizadas sobre os arrays de estado."""
+        start = self.stage.copy()
+        in_stage = [start == stage for stage in range(len(self.stages))]
+        errors = self._error_mask
+        errors.fill(False)
+
+        for index, stage, when in self._errors_before:
+            errors[:, index] = when(v) if stage is None else in_stage[stage] & when(v)
+
+        for stage, rules in self._transitions_by_stage:
+            remaining = in_stage[stage]  # colunas do estágio ainda sem transição neste frame
+            for k, (_, when, to, rep, feedback, error) in enumerate(rules):
+                hit = remaining & when(v)
+                if k + 1 < len(rules):
+                    remaining = remaining & ~hit
+                if to is not None:
+                    self.stage[hit] = to
+                if rep:
+                    self.reps += hit
+                if feedback is not None:
+                    self.feedback[hit] = feedback
+                if error is not None:
+                    errors[:, error] = hit
+
+        for index, stage, when in self._errors_after:
+            errors[:, index] = when(v) if stage is None else (self.stage == stage) & when(v)
+
+        for name, stage, value, _ in self._latches:
+            self.latches[name][in_stage[stage]] = v[value]
+
+    def _advance_single(self, v):
+        """
+        Mesmas regras para uma única coluna (a sessão ao vivo), com escalares: em arrays
+        de um elemento o custo fixo de cada operação vetorizada domina. Os erros são
+        montados direto na lista, já na ordem das regras.
+        """
+        start = int(self.stage[0])
+        errors = []
+
+        for index, stage, when in self._errors_before:
+            if (stage is None or stage == start) and when(v):
+                errors.append(self.error_table[index])
+
+        for stage, when, to, rep, feedback, error in self._transitions:
+            if stage == start and when(v):
+                if to is not None:
+                    self.stage[0] = to
+                if rep:
+                    self.reps[0] += 1
+                if feedback is not None:
+                    self.feedback[0] = feedback
+                if error is not None:
+                    errors.append(self.error_table[error])
+                break
+
+        current = int(self.stage[0])
+        for index, stage, when in self._errors_after:
+            if (stage is None or stage == current) and when(v):
+                errors.append(self.error_table[index])
+
+        for name, stage, value, _ in self._latches:
+            if stage == start:
+                self.latches[name][0] = v[value]
+        self._error_lists[0] = errors
+
+    def reset(self):
+        """Zera repetições, feedback e erros (os valores guardados são mantidos)."""
+        self.stage[:] = self.stages.index(self.rules.get("reset_stage", self.rules["initial_stage"]))
+        self.reps[:] = 0
+        self.feedback[:] = 0
+        self._error_mask[:] = False
+        self.last_angles = None
+        self._error_lists = [[] for _ in range(self.columns)]
+
+    def clear_errors(self):
+        """Descarta os erros do último frame (estágio, repetições e feedback são mantidos)."""
+        self._error_mask[:] = False
+        self._error_lists = [[] for _ in range(self.columns)]
+
+    def near_transition(self, margin):
+        """Para cada coluna, se o ângulo de transição está a menos de `margin` graus do limiar."""
+        if self.last_angles is None:
+            return np.zeros(self.columns, dtype=bool)
+        name, op, threshold = self.rules["near_transition"]
+        angle = self.last_angles[self._angle_names.index(name)]
+        if op == "<":
+            return angle < self._thresholds[threshold] + margin
+        return angle > self._thresholds[threshold] - margin
+
+    def stage_name(self, column=0):
+        return self.stages[self.stage[column]]
+
+    def feedback_text(self, column=0):
+        return self.feedback_table[self.feedback[column]]
+
+    def errors(self, column=0):
+        """Mensagens de erro do último frame para a coluna, na ordem das regras."""
+        cached = self._error_lists[column]
+        if cached is None:
+            row = self._error_mask[column]
+            cached = [self.error_table[index] for index in self._error_order if row[index]]
+            self._error_lists[column] = cached
+        return cached
+
+    def summary(self):
+        """Estado de todas as colunas: {rótulo: {"reps", "stage", "feedback", "errors"}}."""
+        return {
+            label: {
+                "reps": int(self.reps[column]),
+                "stage": self.stage_name(column),
+                "feedback": self.feedback_text(column),
+                "errors": self.errors(column),
+            }
+            for column, label in enumerate(self.labels)
+        }
@@ -0,0 +1,104 @@
+import math
+
+import numpy as np
+
+# --- Agendamento adaptativo da inferência de pose ---
+
+
+class LandmarkPredictor:
+    """
+    Preditor de velocidade constante para os landmarks entre duas inferências.
+    A velocidade é suavizada exponencialmente para não amplificar o ruído da pose,
+    e a extrapolação é limitada a `max_horizon` segundos desde a última medida.
+    """
+    def __init__(self, smoothing=0.5, max_horizon=0.25):
+        self.smoothing = smoothing
+        self.max_horizon = max_horizon
+        self._last = np.zeros((33, 4), dtype=np.float32)
+        self._velocity = np.zeros((33, 2), dtype=np.float32)
+        self._out = np.zeros((33, 4), dtype=np.float32)
+        self._last_t = None
+
+    def reset(self):
+        self._last_t = None
+
+    @property
+    def ready(self):
+        return self._last_t is not None
+
+    def update(self, landmarks, t):
+        """Registra uma medida real (array (33, 4)) feita no instante `t` (segundos)."""
+        if self._last_t is not None and t > self._last_t:
+            velocity = (landmarks[:, :2] - self._last[:, :2]) / (t - self._last_t)
+            self._velocity *= 1.0 - self.smoothing
+            self._velocity += self.smoothing * velocity
+        else:
+            self._velocity[:] = 0.0
+        self._last[:] = landmarks
+        self._last_t = t
+
+    def predict(self, t):
+        """Retorna os landmarks previstos para o instante `t`, ou None sem medida anterior."""
+        if self._last_t is None:
+            return None
+        dt = min(max(t - self._last_t, 0.0), self.max_horizon)
+        self._out[:] = self._last
+        self._out[:, :2] += self._velocity * dt
+        return self._out
+
+
+class AdaptiveInferenceScheduler:
+    """
+    Decide, a cada frame, se a pose deve ser inferida ou prevista.
+
+    Mantém uma média móvel do custo de pose.process e escolhe um passo (stride):
+    a inferência roda a cada `stride` frames, de forma que o custo médio por frame caiba
+    no orçamento de `target_fps`. Frames intermediários usam o LandmarkPredictor.
+    `should_infer(force=True)` força a taxa cheia, usado quando o exercício está perto
+    de uma transição de estágio para não perder o fundo da repetição.
+    """
+    def __init__(self, target_fps=30, max_stride=4, inference_share=0.8, smoothing=0.1, warmup=2):
+        self.frame_budget = 1.0 / target_fps
+        self.max_stride = max_stride
+        self.inference_share = inference_share
+        self.smoothing = smoothing
+        self.warmup = warmup
+        self.inference_cost = None
+        self.stride = 1
+        self.frames_since_inference = 0
+        self.inferred = 0
+        self.predicted = 0
+        self.forced = 0
+
+    def should_infer(self, force=False):
+        self.frames_since_inference += 1
+        if force and self.frames_since_inference < self.stride:
+            self.forced += 1
+        if force or self.frames_since_inference >= self.stride:
+            self.frames_since_inference = 0
+            self.inferred += 1
+            return True
+        self.predicted += 1
+        return False
+
+    def record_inference(self, seconds):
+        """Registra o tempo gasto por uma chamada de inferência e recalcula o stride."""
+        if self.warmup > 0:
+            # As primeiras chamadas incluem a inicialização do grafo e não são representativas
+            self.warmup -= 1
+            return
+        if self.inference_cost is None:
+            self.inference_cost = seconds
+        else:
+            self.inference_cost += self.smoothing * (seconds - self.inference_cost)
+        budget = self.frame_budget * self.inference_share
+        self.stride = min(self.max_stride, max(1, math.ceil(self.inference_cost / budget)))
+
+    def stats(self):
+        return {
+            "stride": self.stride,
+            "inference_ms": (self.inference_cost or 0.0) * 1000.0,
+            "inferred": self.inferred,
+            "predicted": self.predicted,
+            "forced": self.forced,
+        }
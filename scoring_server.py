@@ -0,0 +1,210 @@
+"""
+Serviço assíncrono de pontuação: clientes leves (celulares, quiosques) que rodam o
+próprio modelo de pose enviam os landmarks e recebem repetições, feedback e erros.
+
+    python scoring_server.py --port 8765 --idle-timeout 30
+
+Protocolo (TCP):
+  1. O cliente envia uma linha JSON: {"exercise": "squat", "level": "medium"}
+     e recebe {"session": <id>} ou {"error": "..."}.
+     Uma linha {"stats": true} devolve as estatísticas do servidor e fecha a conexão.
+  2. Em seguida envia registros binários no formato RECORD_DTYPE das gravações .fvlm
+     (t float64, flags uint32, landmarks float32[33][4]), um por frame, em qualquer
+     agrupamento. Sem FLAG_PERSON, o frame conta como "ninguém detectado".
+  3. O servidor responde com uma linha JSON sempre que repetições, feedback ou erros
+     mudam: {"frame": n, "t": t, "reps": ..., "feedback": ..., "errors": [...]}. Quando
+     uma repetição termina, a linha traz também "rep_metrics" (veja rep_analytics.py).
+
+Cada sessão ocupa memória limitada: o estado do exercício tem tamanho fixo, o buffer
+de leitura é limitado a `read_limit` bytes (o transporte para de ler quando enche) e o
+de escrita a `write_limit` bytes (a sessão espera o cliente ler as respostas). Sessões
+sem dados por mais de `idle_timeout` segundos são encerradas.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import resource
+import time
+
+import numpy as np
+
+from exercises import get_exercise_instance, level_thresholds
+from landmark_recording import FLAG_PERSON, RECORD_DTYPE
+from vision_controller import analyze_pose
+
+RECORD_SIZE = RECORD_DTYPE.itemsize
+
+
+def raise_open_file_limit():
+    """Sobe o limite de descritores abertos até o máximo permitido (uma conexão por sessão)."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+class ScoringSession:
+    """Estado de uma sessão: o exercício e a última resposta enviada."""
+    __slots__ = ("session_id", "exercise", "writer", "frames", "last_seen", "last_state", "pending")
+
+    def __init__(self, session_id, exercise, writer):
+        self.session_id = session_id
+        self.exercise = exercise
+        self.writer = writer
+        self.frames = 0
+        self.last_seen = time.monotonic()
+        self.last_state = None
+        self.pending = b""  # fim de um registro que chegou partido
+
+    def score(self, data):
+        """Processa os registros completos em `data` e retorna as respostas a enviar."""
+        data = self.pending + data if self.pending else data
+        complete = len(data) - len(data) % RECORD_SIZE
+        self.pending = data[complete:]
+        if not complete:
+            return b""
+        records = np.frombuffer(data, dtype=RECORD_DTYPE, count=complete // RECORD_SIZE)
+        has_person = (records["flags"] & FLAG_PERSON) != 0
+        landmarks = records["landmarks"]
+        out = []
+        exercise = self.exercise
+        for i, t in enumerate(records["t"].tolist()):
+            reps_before = exercise.reps
+            _, _, general_errors = analyze_pose(exercise, landmarks[i] if has_person[i] else None, t)
+            self.frames += 1
+            errors = general_errors + exercise.errors
+            state = (exercise.reps, exercise.feedback, errors)
+            if state != self.last_state:
+                self.last_state = state
+                response = {
+                    "frame": self.frames - 1, "t": t,
+                    "reps": exercise.reps, "feedback": exercise.feedback, "errors": errors,
+                }
+                if exercise.reps > reps_before:
+                    response["rep_metrics"] = exercise.last_rep
+                out.append(json.dumps(response))
+        return ("\n".join(out) + "\n").encode() if out else b""
+
+
+class ScoringServer:
+    """Servidor asyncio com uma sessão de exercício por conexão."""
+    def __init__(self, max_sessions=10000, idle_timeout=30.0, read_limit=16 * RECORD_SIZE, write_limit=16384):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.read_limit = read_limit
+        self.write_limit = write_limit
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self.frames_scored = 0
+        self.sessions_opened = 0
+        self.sessions_evicted = 0
+        self.sessions_rejected = 0
+        self._started_at = time.monotonic()
+
+    async def serve(self, host="127.0.0.1", port=8765):
+        server = await asyncio.start_server(self._handle, host, port, limit=self.read_limit, backlog=4096)
+        print(f"Servidor de pontuação em {host}:{port}", flush=True)
+        reaper = asyncio.create_task(self._evict_idle())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            reaper.cancel()
+
+    async def _handle(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=self.write_limit)
+        session = None
+        try:
+            try:
+                hello = json.loads(await reader.readline())
+            except (ValueError, asyncio.LimitOverrunError):
+                await self._reply(writer, {"error": "Handshake inválido."})
+                return
+            if not isinstance(hello, dict):
+                await self._reply(writer, {"error": "Handshake inválido."})
+                return
+            if hello.get("stats"):
+                await self._reply(writer, self.stats())
+                return
+            if len(self.sessions) >= self.max_sessions:
+                self.sessions_rejected += 1
+                await self._reply(writer, {"error": "Servidor cheio."})
+                return
+            exercise_name, level = hello.get("exercise"), hello.get("level")
+            if not isinstance(exercise_name, str) or exercise_name not in level_thresholds:
+                await self._reply(writer, {"error": f"Exercício '{exercise_name}' não reconhecido."})
+                return
+            if not isinstance(level, str) or level not in level_thresholds[exercise_name]:
+                await self._reply(writer, {"error": f"Nível '{level}' não reconhecido para '{exercise_name}'."})
+                return
+            exercise = get_exercise_instance(exercise_name, level)
+
+            session = ScoringSession(next(self._ids), exercise, writer)
+            self.sessions[session.session_id] = session
+            self.sessions_opened += 1
+            await self._reply(writer, {"session": session.session_id})
+
+            while True:
+                data = await reader.read(self.read_limit)
+                if not data:
+                    break
+                session.last_seen = time.monotonic()
+                frames_before = session.frames
+                response = session.score(data)
+                self.frames_scored += session.frames - frames_before
+                if response:
+                    writer.write(response)
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if session is not None:
+                self.sessions.pop(session.session_id, None)
+            writer.close()
+
+    async def _reply(self, writer, message):
+        writer.write((json.dumps(message, ensure_ascii=False) + "\n").encode())
+        await writer.drain()
+
+    async def _evict_idle(self):
+        """Fecha as sessões sem dados há mais de `idle_timeout` segundos."""
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 0.05))
+            deadline = time.monotonic() - self.idle_timeout
+            for session in [s for s in self.sessions.values() if s.last_seen < deadline]:
+                self.sessions.pop(session.session_id, None)
+                self.sessions_evicted += 1
+                session.writer.close()
+
+    def stats(self):
+        return {
+            "sessions": len(self.sessions),
+            "sessions_opened": self.sessions_opened,
+            "sessions_evicted": self.sessions_evicted,
+            "sessions_rejected": self.sessions_rejected,
+            "frames_scored": self.frames_scored,
+            "uptime_s": time.monotonic() - self._started_at,
+            "cpu_s": time.process_time(),
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço de pontuação de landmarks do FitVision.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=30.0, help="Segundos sem dados até encerrar a sessão.")
+    args = parser.parse_args(argv)
+
+    raise_open_file_limit()
+    server = ScoringServer(max_sessions=args.max_sessions, idle_timeout=args.idle_timeout)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
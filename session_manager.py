@@ -0,0 +1,142 @@
+import threading
+import time
+
+# --- Câmera e modelo de pose aquecidos e reaproveitados entre sessões ---
+#
+# Este módulo não importa cv2 nem mediapipe no topo: o menu abre sem esperar por eles,
+# e o aquecimento os importa em segundo plano.
+
+
+class SessionManager:
+    """
+    Abre a câmera e carrega o grafo do MediaPipe Pose em uma thread de fundo (enquanto o
+    menu está na tela) e os mantém abertos entre as sessões. Trocar de exercício ou de
+    nível só cria um novo objeto de exercício; câmera e Pose continuam os mesmos.
+    Com `auto_quality`, o aquecimento também carrega (ou mede, na primeira vez nesta
+    máquina) o perfil de qualidade da pose para `target_fps` (veja quality.py).
+    Com `history`, as sessões são gravadas no histórico (em `history_path` ou no local
+    padrão de history_store.py).
+    """
+    def __init__(self, source=0, target_fps=30, auto_quality=True, history=True, history_path=None):
+        self.source = source
+        self.realtime = isinstance(source, int)
+        self.target_fps = target_fps
+        self.auto_quality = auto_quality
+        self.cap = None
+        self.pose = None
+        self.quality = None
+        self.history_enabled = history
+        self.history_path = history_path
+        self.history = None
+        self.error = None
+        self.warmup_seconds = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def warm_up(self):
+        """Inicia o aquecimento em segundo plano (chamadas repetidas não fazem nada)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._warm_up, name="fitvision-warmup", daemon=True)
+            self._thread.start()
+
+    def _warm_up(self):
+        started_at = time.perf_counter()
+        try:
+            import numpy as np
+            import vision_controller
+            from history_store import DEFAULT_HISTORY_PATH, HistoryStore
+
+            if self.history_enabled:
+                try:
+                    self.history = HistoryStore(self.history_path or DEFAULT_HISTORY_PATH)
+                except Exception as e:
+                    # Sem histórico a sessão funciona normalmente
+                    print(f"Erro ao abrir o histórico de sessões: {e}")
+
+            self.cap = vision_controller.open_camera(self.source)
+            if self.auto_quality and self.target_fps:
+                from quality import create_quality_controller
+
+                cap = self.cap
+                self.quality = create_quality_controller(
+                    vision_controller.create_pose,
+                    lambda: vision_controller.read_sample_frames(cap) if cap is not None else [],
+                    self.target_fps,
+                )
+                self.pose = self.quality.pose
+                # Os modelos vizinhos carregam em segundo plano: uma troca de nível no meio da
+                # sessão não espera o grafo (nem o download do modelo)
+                self.quality.preload()
+            else:
+                self.pose = vision_controller.create_pose()
+            # Uma inferência em uma imagem vazia força o carregamento do grafo e do modelo
+            self.pose.process(np.zeros((256, 256, 3), dtype=np.uint8))
+            if self.cap is not None and self.realtime:
+                self.cap.read()  # a primeira leitura inclui a inicialização do driver
+        except Exception as e:
+            print(f"Erro ao preparar a câmera e o modelo: {e}")
+            self.error = e
+        finally:
+            self.warmup_seconds = time.perf_counter() - started_at
+            self._ready.set()
+
+    def wait_ready(self, timeout=None):
+        """Aguarda o fim do aquecimento (iniciando-o se preciso). Retorna False no timeout."""
+        self.warm_up()
+        return self._ready.wait(timeout)
+
+    def run_session(self, exercise_name, level, **kwargs):
+        """
+        Executa uma sessão com a câmera e o Pose já aquecidos; aceita os mesmos parâmetros
+        opcionais de run_exercise_session (display, target_fps, record_path...). O tempo
+        até o primeiro frame é contado a partir desta chamada.
+        """
+        requested_at = time.perf_counter()
+        self.wait_ready()
+        if self.error is not None:
+            return None
+
+        import cv2
+        import vision_controller
+
+        if self.cap is None:
+            # A câmera pode ter sido conectada depois que o menu abriu
+            self.cap = vision_controller.open_camera(self.source)
+            if self.cap is None:
+                return None
+        if not self.realtime:
+            # Arquivos de vídeo recomeçam do início a cada sessão
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+        kwargs.setdefault("target_fps", self.target_fps)
+        stats = vision_controller.run_exercise_session(
+            self.cap, self.pose, exercise_name, level, realtime=self.realtime, requested_at=requested_at,
+            quality=self.quality, history=self.history, **kwargs
+        )
+        if self.quality is not None:
+            # O nível pode ter mudado durante a sessão
+            self.pose = self.quality.pose
+        if kwargs.get("display", True):
+            cv2.destroyAllWindows()
+        return stats
+
+    def close(self):
+        """Libera a câmera e o Pose (aguarda o aquecimento, se ainda estiver em andamento)."""
+        if self._thread is not None:
+            self._ready.wait()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        if self.quality is not None:
+            self.quality.close()
+            self.quality = None
+        elif self.pose is not None:
+            self.pose.close()
+        self.pose = None
@@ -0,0 +1,310 @@
+"""
+Modo multi-câmera: várias estações (fonte de vídeo + exercício + nível) em uma máquina,
+com a inferência de pose distribuída por um pool de processos.
+
+    python station_server.py --station 0:squat:medium --station 1:bicep_curl:beginner
+    python station_server.py --station treino.mp4:squat:advanced --scaling
+
+Cada estação tem sua thread de captura (só o frame mais recente fica guardado), seu
+exercício e seu estado. Cada estação tem no máximo um frame em processamento
+(backpressure por estação), e o despachante percorre as estações em rodízio para que
+nenhuma monopolize os workers. Os frames vão para os workers por memória compartilhada,
+um slot por estação, sem serializar a imagem.
+
+Cada estação fica fixa em um worker (`stream_id % workers`), porque o rastreamento do
+MediaPipe daquela câmera vive no processo do worker. O rodízio só é justo entre estações
+do mesmo worker: se o número de estações não for múltiplo do número de workers, as que
+dividem um worker ficam com uma fração do FPS enquanto outros workers têm folga (com 3
+estações e 2 workers, duas dividem um worker). O campo "worker" de cada estação no
+relatório mostra a distribuição; para FPS igual entre estações, use um número de
+estações múltiplo de --workers.
+"""
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from exercises import get_exercise_instance, level_thresholds
+from pipeline import CaptureThread, DropOldestQueue
+from vision_controller import analyze_pose
+
+# Tamanho máximo do frame de entrada de cada slot de memória compartilhada
+MAX_FRAME_SHAPE = (1080, 1920, 3)
+
+
+def _pose_worker(task_queue, result_queue, min_detection_confidence, min_tracking_confidence):
+    """
+    Processo de inferência. Mantém um RoiPoseEstimator (com o próprio Pose) por estação,
+    para que o rastreamento do MediaPipe não misture pessoas de câmeras diferentes.
+    """
+    import mediapipe as mp
+    from roi_tracker import RoiPoseEstimator
+
+    cv2.setNumThreads(1)
+    estimators = {}
+    slots = {}
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        if task[0] == "open":
+            # Registro da estação: cria o Pose e roda uma inferência vazia para carregar o grafo
+            _, stream_id, shm_name = task
+            pose = mp.solutions.pose.Pose(
+                min_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence,
+            )
+            pose.process(np.zeros((64, 64, 3), dtype=np.uint8))
+            estimators[stream_id] = RoiPoseEstimator(pose)
+            slots[stream_id] = shared_memory.SharedMemory(name=shm_name)
+            result_queue.put(("ready", stream_id))
+            continue
+        _, stream_id, shape, frame_index, captured_at = task
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=slots[stream_id].buf)
+        started_at = time.perf_counter()
+        landmarks = estimators[stream_id].process(frame)
+        infer_seconds = time.perf_counter() - started_at
+        result_queue.put((stream_id, frame_index, captured_at, None if landmarks is None else landmarks.copy(), infer_seconds))
+
+    for estimator in estimators.values():
+        estimator.pose.close()
+    for slot in slots.values():
+        slot.close()
+
+
+class Station:
+    """Uma câmera com seu exercício, nível e estado próprios."""
+    def __init__(self, stream_id, source, exercise_name, level, latency_window=300, worker=0):
+        self.stream_id = stream_id
+        self.worker = worker
+        self.source = source
+        self.exercise_name = exercise_name
+        self.level = level
+        self.exercise = get_exercise_instance(exercise_name, level)
+        if self.exercise is None:
+            raise ValueError(f"Exercício '{exercise_name}' não reconhecido.")
+
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Não foi possível abrir a fonte {source!r}.")
+        self.realtime = isinstance(source, int)
+        if self.realtime:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.frames = DropOldestQueue(maxsize=1)
+        self.capture = CaptureThread(self.cap, self.frames, self.realtime)
+        self.slot = shared_memory.SharedMemory(create=True, size=int(np.prod(MAX_FRAME_SHAPE)))
+        self.in_flight = False
+        self.finished = False
+        self.scored = 0
+        self.latencies_ms = collections.deque(maxlen=latency_window)
+
+    def stats(self, elapsed):
+        latencies = sorted(self.latencies_ms)
+        return {
+            "stream": self.stream_id,
+            "source": self.source,
+            "exercise": self.exercise_name,
+            "level": self.level,
+            "worker": self.worker,
+            "frames_captured": self.capture.frames_read,
+            "frames_scored": self.scored,
+            "dropped": self.frames.dropped,
+            "fps": self.scored / elapsed if elapsed > 0 else 0.0,
+            "latency_ms_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_ms_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+            "reps": self.exercise.reps,
+        }
+
+    def close(self):
+        self.capture.stop_event.set()
+        self.frames.close()
+        if self.capture.ident is not None:
+            self.capture.join(timeout=1.0)
+        self.cap.release()
+        self.slot.close()
+        self.slot.unlink()
+
+
+class StationServer:
+    """
+    Despacha os frames das estações para um pool de workers de pose e aplica a lógica
+    do exercício de cada estação, na ordem dos frames, no processo principal.
+    """
+    def __init__(self, station_specs, workers=None, min_detection_confidence=0.6, min_tracking_confidence=0.7):
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.stations = []
+        try:
+            for i, spec in enumerate(station_specs):
+                # A estação fica fixa em um worker para manter o rastreamento do MediaPipe
+                self.stations.append(Station(i, *spec, worker=i % self.workers))
+        except Exception:
+            # Libera as câmeras e os slots de memória compartilhada das estações já criadas
+            for station in self.stations:
+                station.close()
+            raise
+        self._context = multiprocessing.get_context("spawn")
+        self._results = self._context.Queue()
+        self._tasks = [self._context.Queue() for _ in range(self.workers)]
+        self._processes = [
+            self._context.Process(
+                target=_pose_worker,
+                args=(task_queue, self._results, min_detection_confidence, min_tracking_confidence),
+                daemon=True,
+            )
+            for task_queue in self._tasks
+        ]
+
+    def _dispatch(self, station):
+        """Envia o frame mais recente da estação, se ela não tiver nenhum em processamento."""
+        packet = station.frames.get(timeout=0)
+        if packet is None:
+            if station.frames.closed:
+                station.finished = True
+            return False
+        frame = packet.frame
+        if frame.nbytes > station.slot.size:
+            frame = cv2.resize(frame, (MAX_FRAME_SHAPE[1], MAX_FRAME_SHAPE[0]))
+        np.ndarray(frame.shape, dtype=np.uint8, buffer=station.slot.buf)[:] = frame
+        self._tasks[station.worker].put(("frame", station.stream_id, frame.shape, packet.index, packet.captured_at))
+        station.in_flight = True
+        return True
+
+    def _score(self, result):
+        stream_id, _, captured_at, landmarks, _ = result
+        station = self.stations[stream_id]
+        station.in_flight = False
+        analyze_pose(station.exercise, landmarks, captured_at)
+        station.scored += 1
+        station.latencies_ms.append((time.perf_counter() - captured_at) * 1000.0)
+
+    def run(self, duration=None, report_every=5.0):
+        """Executa até todas as fontes acabarem ou `duration` segundos. Retorna o relatório."""
+        started_at = last_report = time.perf_counter()
+        next_station = 0
+        try:
+            for process in self._processes:
+                process.start()
+            # Aguarda todos os workers carregarem o modelo antes de abrir as capturas
+            for station in self.stations:
+                self._tasks[station.worker].put(("open", station.stream_id, station.slot.name))
+            self._wait_ready()
+            for station in self.stations:
+                station.capture.start()
+
+            started_at = last_report = time.perf_counter()
+            while True:
+                now = time.perf_counter()
+                if duration is not None and now - started_at >= duration:
+                    break
+                if all(s.finished and not s.in_flight for s in self.stations):
+                    break
+
+                # Rodízio: cada volta começa por uma estação diferente
+                dispatched = False
+                count = len(self.stations)
+                for k in range(count):
+                    station = self.stations[(next_station + k) % count]
+                    if not station.in_flight and not station.finished:
+                        dispatched |= self._dispatch(station)
+                next_station = (next_station + 1) % count
+
+                try:
+                    result = self._results.get(timeout=0.002 if dispatched else 0.01)
+                    self._score(result)
+                    while True:
+                        self._score(self._results.get_nowait())
+                except queue.Empty:
+                    pass
+
+                if report_every and now - last_report >= report_every:
+                    print(json.dumps(self.report(now - started_at)))
+                    last_report = now
+        finally:
+            elapsed = time.perf_counter() - started_at
+            self.close()
+        return self.report(elapsed)
+
+    def _wait_ready(self, poll=0.5):
+        """Aguarda o "ready" de cada estação; falha se algum worker terminar antes de responder."""
+        pending = len(self.stations)
+        while pending:
+            try:
+                self._results.get(timeout=poll)
+                pending -= 1
+            except queue.Empty:
+                dead = [p for p in self._processes if not p.is_alive()]
+                if dead:
+                    raise RuntimeError(
+                        f"Worker de pose encerrado antes de carregar o modelo (código {dead[0].exitcode})."
+                    )
+
+    def report(self, elapsed):
+        streams = [station.stats(elapsed) for station in self.stations]
+        latencies = sorted(l for station in self.stations for l in station.latencies_ms)
+        scored = sum(s["frames_scored"] for s in streams)
+        return {
+            "cameras": len(self.stations),
+            "workers": self.workers,
+            "seconds": round(elapsed, 3),
+            "aggregate_fps": scored / elapsed if elapsed > 0 else 0.0,
+            "latency_ms_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+            "latency_ms_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+            "streams": streams,
+        }
+
+    def close(self):
+        for task_queue in self._tasks:
+            task_queue.put(None)
+        for process in self._processes:
+            if process.pid is None:
+                continue  # não chegou a ser iniciado
+            process.join(timeout=5.0)
+            if process.is_alive():
+                process.terminate()
+        for station in self.stations:
+            station.close()
+
+
+def _parse_station(text):
+    """Converte "fonte:exercício:nível" em (fonte, exercício, nível); fonte numérica é uma câmera."""
+    source, exercise_name, level = text.rsplit(":", 2)
+    if exercise_name not in level_thresholds:
+        raise argparse.ArgumentTypeError(f"Exercício desconhecido: {exercise_name}")
+    if level not in level_thresholds[exercise_name]:
+        raise argparse.ArgumentTypeError(
+            f"Nível desconhecido para {exercise_name}: {level} (use {', '.join(level_thresholds[exercise_name])})"
+        )
+    return (int(source) if source.isdigit() else source), exercise_name, level
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor multi-câmera do FitVision.")
+    parser.add_argument("--station", action="append", type=_parse_station, required=True,
+                        help="fonte:exercício:nível (ex.: 0:squat:medium). Pode repetir.")
+    parser.add_argument("--workers", type=int, default=None, help="Processos de pose (padrão: núcleos - 1).")
+    parser.add_argument("--duration", type=float, default=None, help="Duração em segundos.")
+    parser.add_argument("--scaling", action="store_true",
+                        help="Mede a escala com 1..N estações e imprime um relatório por configuração.")
+    args = parser.parse_args(argv)
+
+    if args.scaling:
+        for n in range(1, len(args.station) + 1):
+            report = StationServer(args.station[:n], workers=args.workers).run(args.duration, report_every=0)
+            report.pop("streams")
+            print(json.dumps(report))
+    else:
+        print(json.dumps(StationServer(args.station, workers=args.workers).run(args.duration), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,54 @@
+import enum
+
 import numpy as np
 
+# Índices dos 33 landmarks do MediaPipe Pose (os mesmos de mp.solutions.pose.PoseLandmark),
+# fixos aqui para que a lógica dos exercícios não precise importar o mediapipe
+class PoseLandmark(enum.IntEnum):
+    NOSE = 0
+    LEFT_EYE_INNER = 1
+    LEFT_EYE = 2
+    LEFT_EYE_OUTER = 3
+    RIGHT_EYE_INNER = 4
+    RIGHT_EYE = 5
+    RIGHT_EYE_OUTER = 6
+    LEFT_EAR = 7
+    RIGHT_EAR = 8
+    MOUTH_LEFT = 9
+    MOUTH_RIGHT = 10
+    LEFT_SHOULDER = 11
+    RIGHT_SHOULDER = 12
+    LEFT_ELBOW = 13
+    RIGHT_ELBOW = 14
+    LEFT_WRIST = 15
+    RIGHT_WRIST = 16
+    LEFT_PINKY = 17
+    RIGHT_PINKY = 18
+    LEFT_INDEX = 19
+    RIGHT_INDEX = 20
+    LEFT_THUMB = 21
+    RIGHT_THUMB = 22
+    LEFT_HIP = 23
+    RIGHT_HIP = 24
+    LEFT_KNEE = 25
+    RIGHT_KNEE = 26
+    LEFT_ANKLE = 27
+    RIGHT_ANKLE = 28
+    LEFT_HEEL = 29
+    RIGHT_HEEL = 30
+    LEFT_FOOT_INDEX = 31
+    RIGHT_FOOT_INDEX = 32
+
+# Ligações do esqueleto desenhadas na tela (as mesmas de mp.solutions.pose.POSE_CONNECTIONS)
+POSE_CONNECTIONS = frozenset([
+    (0, 1), (0, 4), (1, 2), (2, 3), (3, 7), (4, 5), (5, 6), (6, 8), (9, 10),
+    (11, 12), (11, 13), (11, 23), (12, 14), (12, 24), (13, 15), (14, 16),
+    (15, 17), (15, 19), (15, 21), (16, 18), (16, 20), (16, 22), (17, 19), (18, 20),
+    (23, 24), (23, 25), (24, 26), (25, 27), (26, 28), (27, 29), (27, 31),
+    (28, 30), (28, 32), (29, 31), (30, 32),
+])
+
+
 def calculate_angle(a, b, c):
     """
     Calcula o ângulo entre três pontos (em graus) usando atan2.
@@ -19,3 +68,48 @@ def calculate_angle(a, b, c):
         angle = 360 - angle
 
     return angle
+
+
+def landmarks_to_array(landmarks, out=None):
+    """
+    Converte o resultado do MediaPipe Pose em um único array (33, 4) float32
+    com as colunas (x, y, z, visibility). Aceita um NormalizedLandmarkList,
+    a sequência `.landmark` ou um array já convertido (retornado sem cópia).
+    Se `out` (contíguo) for fornecido, o array é preenchido no lugar.
+    """
+    if isinstance(landmarks, np.ndarray):
+        return landmarks
+    if hasattr(landmarks, "landmark"):
+        landmarks = landmarks.landmark
+    # Uma lista plana e uma única atribuição: atribuir linha a linha custa uma conversão por landmark
+    values = [value for lm in landmarks for value in (lm.x, lm.y, lm.z, lm.visibility)]
+    if out is None:
+        return np.array(values, dtype=np.float32).reshape(-1, 4)
+    out.reshape(-1)[:] = values
+    return out
+
+
+def gate_landmarks(array, required, min_visibility):
+    """
+    Verificações de enquadramento de um frame, vetorizadas sobre o array (33, 4):
+    retorna (mínimos (x, y), máximos (x, y), máscara de visibilidade por landmark e se
+    todos os landmarks de `required` (array de índices) estão visíveis).
+    """
+    xy = array[:, :2]
+    visible = array[:, 3] >= min_visibility
+    return xy.min(axis=0), xy.max(axis=0), visible, bool(visible[required].all())
+
+
+def calculate_angles(array, triplets):
+    """
+    Versão vetorizada de calculate_angle: calcula de uma vez os ângulos (em graus)
+    de todas as triplas (a, b, c) de índices de landmarks, com 'b' como vértice.
+    `array` é o array (33, 4) de landmarks e `triplets` um array (K, 3) de índices.
+    Retorna um array (K,) com os ângulos no intervalo [0, 180].
+    """
+    points = array[:, :2][triplets]  # (K, 3, 2)
+    ba = points[:, 0] - points[:, 1]
+    bc = points[:, 2] - points[:, 1]
+    radians = np.arctan2(bc[:, 1], bc[:, 0]) - np.arctan2(ba[:, 1], ba[:, 0])
+    angles = np.abs(np.degrees(radians))
+    return np.where(angles > 180.0, 360.0 - angles, angles)
@@ -1,25 +1,22 @@
+import time
+
 import cv2
-import mediapipe as mp
 import numpy as np
 
-# Importa as classes de exercícios e a função de utilidade
-from exercises import Squat, BicepCurl, JumpingJack
-from utils import calculate_angle
+# Importa a fábrica de exercícios e as funções de utilidade
+from exercises import get_exercise_instance
+from utils import POSE_CONNECTIONS, calculate_angle, gate_landmarks, landmarks_to_array
+from pipeline import SessionPipeline
+from hud import HudCompositor, StageStatsOverlay, NORD_NIGHT, NORD_SNOW, NORD_FROST_GREEN, NORD_FROST_CYAN, NORD_AURORA_RED
+from roi_tracker import RoiPoseEstimator
+from scheduler import AdaptiveInferenceScheduler, LandmarkPredictor
+from landmark_recording import LandmarkRecorder
+from profiling import FrameProfiler
+from frame_buffers import MirroredResize
+from quality import create_quality_controller
 
 # --- Funções de UI e Desenho ---
 
-def hex_to_bgr(hex_color):
-    """Converte uma cor hexadecimal para o formato BGR do OpenCV."""
-    hex_color = hex_color.lstrip('#')
-    return tuple(int(hex_color[i:i+2], 16) for i in (4, 2, 0))
-
-# Paleta de cores (Nord) para consistência visual
-NORD_NIGHT = hex_to_bgr("#2E3440")
-NORD_SNOW = hex_to_bgr("#D8DEE9")
-NORD_FROST_GREEN = hex_to_bgr("#A3BE8C")
-NORD_FROST_CYAN = hex_to_bgr("#88C0D0")
-NORD_AURORA_RED = hex_to_bgr("#BF616A")
-
 def draw_panel(image, x, y, width, height, color, alpha=0.6):
     """Desenha um painel semi-transparente na imagem."""
     overlay = image.copy()
@@ -27,38 +24,218 @@ def draw_panel(image, x, y, width, height, color, alpha=0.6):
     cv2.addWeighted(overlay, alpha, image, 1 - alpha, 0, image)
 
 
-def start_exercise_session(exercise_name, level):
+# --- CONFIGURAÇÕES GERAIS ---
+DISPLAY_WIDTH = 1280
+DISPLAY_HEIGHT = 720
+MIN_PERSON_HEIGHT_PROPORTION = 0.5
+MIN_LANDMARK_VISIBILITY = 0.6
+
+
+def analyze_pose(exercise, pose_landmarks, timestamp=None, min_visibility=MIN_LANDMARK_VISIBILITY):
     """
-    Inicia a sessão de exercício com a câmera, processando o exercício selecionado.
+    Aplica a detecção de pessoa e, se houver alguém bem enquadrado, a lógica do exercício.
+    `timestamp` é o instante do frame em segundos (padrão: o relógio atual).
+    Se algum landmark de exercise.required_joints tiver visibilidade abaixo de
+    `min_visibility`, o frame não passa pela lógica do exercício (nem a zera): a posição
+    de uma articulação encoberta é só um palpite do modelo e pode gerar repetições falsas.
+    Retorna (landmark_array, person_detected, general_errors).
     """
-    # --- CONFIGURAÇÕES GERAIS ---
-    DISPLAY_WIDTH = 1280
-    DISPLAY_HEIGHT = 720
-    MIN_PERSON_HEIGHT_PROPORTION = 0.5
-    MIN_LANDMARK_VISIBILITY = 0.6
-
-    # --- FUNÇÃO AUXILIAR PARA OBTER INSTÂNCIA DO EXERCÍCIO ---
-    def get_exercise_instance(name, lvl):
-        if name == "squat":
-            return Squat(lvl)
-        elif name == "bicep_curl":
-            return BicepCurl(lvl)
-        elif name == "jumping_jack":
-            return JumpingJack(lvl)
-        return None
+    general_errors = []
+    person_detected = False
+    joints_visible = False
+    landmark_array = None
 
-    # --- INICIALIZAÇÃO DA CÂMERA E MEDIAPIPE ---
-    cap = cv2.VideoCapture(0)
+    # Lógica de detecção de pessoa
+    if pose_landmarks is not None:
+        # Converte a pose uma única vez por frame para o array (33, 4)
+        landmark_array = landmarks_to_array(pose_landmarks)
+        low, high, _, joints_visible = gate_landmarks(landmark_array, exercise.required_joints, min_visibility)
+        if high[1] - low[1] > MIN_PERSON_HEIGHT_PROPORTION:
+            person_detected = True
+        else:
+            general_errors.append("Aproxime-se da camera!")
+    else:
+        general_errors.append("Ninguem detectado. Posicione-se na camera.")
+
+    # Processa os landmarks se uma pessoa foi detectada
+    if not person_detected:
+        exercise.reset()
+    elif not joints_visible:
+        # Os erros de postura do último frame avaliado não valem para a pose encoberta
+        exercise.clear_errors()
+        general_errors.append("Articulacoes encobertas! Mostre o corpo inteiro.")
+    else:
+        try:
+            exercise.process_landmarks(landmark_array, timestamp)
+        except Exception as e:
+            print(f"ERRO AO PROCESSAR LANDMARKS: {e}")
+            general_errors.append("Erro no processamento. Tente se reposicionar.")
+
+    return landmark_array, person_detected, general_errors
+
+
+def draw_hud(image, exercise_name, level, reps, feedback, all_errors):
+    """
+    Desenha os painéis de repetições, informações, feedback e erros na imagem.
+    Versão imediata (sem cache) do HudCompositor, mantida como referência de benchmark.
+    """
+    # 1. Painel de Repetições (canto superior direito)
+    reps_text = str(reps)
+    (w_reps_label, h_reps_label), _ = cv2.getTextSize("REPS", cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+    (w_reps_num, h_reps_num), _ = cv2.getTextSize(reps_text, cv2.FONT_HERSHEY_TRIPLEX, 2, 5)
+
+    panel_w = 160
+    panel_h = 120
+    panel_x = DISPLAY_WIDTH - panel_w - 40
+    panel_y = 40
+
+    draw_panel(image, panel_x, panel_y, panel_w, panel_h, NORD_NIGHT)
+    cv2.putText(image, "REPS", (panel_x + (panel_w - w_reps_label) // 2, panel_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_SNOW, 2, cv2.LINE_AA)
+    cv2.putText(image, reps_text, (panel_x + (panel_w - w_reps_num) // 2, panel_y + 100), cv2.FONT_HERSHEY_TRIPLEX, 2, NORD_FROST_GREEN, 5, cv2.LINE_AA)
+
+    # 2. Painel de Informações do Exercício (canto superior esquerdo)
+    info_text_1 = f"Exercicio: {exercise_name.replace('_', ' ').upper()}"
+    info_text_2 = f"Nivel: {level.upper()}"
+    draw_panel(image, 40, 40, 350, 120, NORD_NIGHT) # Painel com tamanho fixo
+    cv2.putText(image, info_text_1, (60, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_FROST_CYAN, 2, cv2.LINE_AA)
+    cv2.putText(image, info_text_2, (60, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_FROST_CYAN, 2, cv2.LINE_AA)
+
+    # 3. Painel de Feedback (centro inferior)
+    if feedback:
+        (w, h), _ = cv2.getTextSize(feedback, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+        x_pos = (DISPLAY_WIDTH - w) // 2
+        y_pos = DISPLAY_HEIGHT - 80
+        draw_panel(image, x_pos - 20, y_pos - h - 10, w + 40, h + 30, NORD_NIGHT)
+        feedback_color = NORD_FROST_GREEN if "Boa" in feedback else NORD_SNOW
+        cv2.putText(image, feedback, (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 1, feedback_color, 2, cv2.LINE_AA)
+
+    # 4. Painel de Erros (canto inferior direito)
+    if all_errors:
+        error_panel_h = len(all_errors) * 35 + 25
+        y_offset_errors = DISPLAY_HEIGHT - 40 - error_panel_h
+        draw_panel(image, DISPLAY_WIDTH - 440, y_offset_errors, 400, error_panel_h, NORD_NIGHT)
+        for i, error in enumerate(all_errors):
+            cv2.putText(image, f"- {error}", (DISPLAY_WIDTH - 420, y_offset_errors + 30 + i * 35), cv2.FONT_HERSHEY_SIMPLEX, 0.7, NORD_AURORA_RED, 2, cv2.LINE_AA)
+
+
+def draw_pose_landmarks(image, landmark_array, connections, min_visibility=0.5):
+    """Desenha o esqueleto a partir do array (33, 4) de landmarks normalizados."""
+    h, w = image.shape[:2]
+    points = (landmark_array[:, :2] * (w, h)).astype(np.int32).tolist()
+    visible = (landmark_array[:, 3] >= min_visibility).tolist()
+    for a, b in connections:
+        if visible[a] and visible[b]:
+            cv2.line(image, points[a], points[b], (245, 66, 230), 2)
+    for point, is_visible in zip(points, visible):
+        if is_visible:
+            cv2.circle(image, point, 2, (245, 117, 66), 2)
+
+
+def open_camera(source=0):
+    """Abre a fonte de vídeo; para câmeras, configura 640x480 e o buffer mínimo. Retorna None se falhar."""
+    cap = cv2.VideoCapture(source)
     if not cap.isOpened():
         print("Erro: Não foi possível abrir a câmera.")
+        return None
+    if isinstance(source, int):
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        # Evita que o driver acumule frames antigos no próprio buffer
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+def create_pose(model_complexity=1):
+    """Cria o MediaPipe Pose da sessão (o mediapipe só é importado aqui)."""
+    import mediapipe as mp
+    return mp.solutions.pose.Pose(
+        model_complexity=model_complexity, min_detection_confidence=0.6, min_tracking_confidence=0.7
+    )
+
+
+def read_sample_frames(cap, count=12):
+    """Lê até `count` frames para medir a máquina; arquivos de vídeo voltam ao início."""
+    frames = []
+    for _ in range(count):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    if cap.get(cv2.CAP_PROP_FRAME_COUNT) > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+    return frames
+
+
+def start_exercise_session(exercise_name, level, source=0, display=True, target_fps=30, record_path=None,
+                           profile=False, profile_path=None, auto_quality=True, history=None, user="default"):
+    """
+    Inicia a sessão de exercício com a câmera, processando o exercício selecionado.
+
+    A sessão roda em pipeline: uma thread de captura mantém só o frame mais recente,
+    uma thread de inferência executa o MediaPipe e a lógica do exercício, e a thread
+    atual desenha e exibe o resultado. `source` pode ser o índice da câmera ou o
+    caminho de um arquivo de vídeo (neste caso nenhum frame é descartado).
+    Se a pose não acompanhar `target_fps`, ela passa a rodar a cada N frames e os
+    frames intermediários usam landmarks previstos (target_fps=None desativa).
+    Com `auto_quality`, a complexidade do modelo e a resolução de entrada da pose são
+    escolhidas para caber em `target_fps` (veja quality.py); a primeira sessão em cada
+    máquina mede os níveis e salva o perfil.
+    Com `record_path`, os landmarks de cada frame são gravados (sem vídeo) para que a
+    sessão possa ser reavaliada depois com replay.py.
+    Com um HistoryStore em `history`, a sessão, as repetições (com suas métricas) e os
+    erros ficam no histórico de `user`; a gravação roda em outra thread.
+    Com `profile` (ou `profile_path`), cada estágio do loop é cronometrado; os percentis
+    vão para o resumo retornado e, se `profile_path` for dado, para um arquivo JSON lines
+    a cada 5 s. A tecla D mostra/esconde o painel de depuração com os percentis.
+    Retorna o resumo de desempenho da sessão (FPS, latência ponta a ponta e o tempo até
+    o primeiro frame, que aqui inclui abrir a câmera e carregar o Pose).
+    """
+    requested_at = time.perf_counter()
+    if get_exercise_instance(exercise_name, level) is None:
+        print(f"Erro: Exercício '{exercise_name}' não reconhecido.")
         return
 
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    # --- INICIALIZAÇÃO DA CÂMERA E MEDIAPIPE ---
+    cap = open_camera(source)
+    if cap is None:
+        return
+    quality = None
+    pose = None
+    try:
+        if target_fps and auto_quality:
+            quality = create_quality_controller(create_pose, lambda: read_sample_frames(cap), target_fps)
+            pose = quality.pose
+            quality.preload()
+        else:
+            pose = create_pose()
+        stats = run_exercise_session(
+            cap, pose, exercise_name, level, realtime=isinstance(source, int), display=display,
+            target_fps=target_fps, record_path=record_path, profile=profile, profile_path=profile_path,
+            requested_at=requested_at, quality=quality, history=history, user=user,
+        )
+    finally:
+        cap.release()
+        if quality is not None:
+            quality.close()
+        elif pose is not None:
+            pose.close()
+    if display:
+        cv2.destroyAllWindows()
+    return stats
 
-    mp_drawing = mp.solutions.drawing_utils
-    mp_pose = mp.solutions.pose
 
+def run_exercise_session(cap, pose, exercise_name, level, realtime=True, display=True, target_fps=30,
+                         record_path=None, profile=False, profile_path=None, requested_at=None, quality=None,
+                         history=None, user="default"):
+    """
+    Executa a sessão sobre uma câmera e um Pose já abertos, sem liberá-los no final,
+    para que possam ser reaproveitados (veja SessionManager). Os demais parâmetros são
+    os de start_exercise_session; `requested_at` (perf_counter) marca o início da
+    contagem do tempo até o primeiro frame. Com um QualityController em `quality`, o
+    Pose e a resolução de entrada vêm dele e acompanham as trocas de nível.
+    """
+    if requested_at is None:
+        requested_at = time.perf_counter()
     current_exercise = get_exercise_instance(exercise_name, level)
     if not current_exercise:
         print(f"Erro: Exercício '{exercise_name}' não reconhecido.")
@@ -67,102 +244,137 @@ def start_exercise_session(exercise_name, level):
     print(f"Iniciando exercício: {exercise_name.upper()} | Nível: {level.upper()}")
 
     # --- LOOP PRINCIPAL DE PROCESSAMENTO DE VÍDEO ---
-    with mp_pose.Pose(min_detection_confidence=0.6, min_tracking_confidence=0.7) as pose:
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                print("Não foi possível receber o frame. Encerrando...")
-                break
-
-            # Redimensiona e processa o frame
-            processed_frame = cv2.resize(frame, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
-            processed_frame = cv2.flip(processed_frame, 1)
-            image = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-            
-            image.flags.writeable = False
-            results = pose.process(image)
-            image.flags.writeable = True
-            image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
-
-            general_errors = []
-            person_detected = False
-
-            # Lógica de detecção de pessoa
-            if results.pose_landmarks:
-                y_coords = [landmark.y for landmark in results.pose_landmarks.landmark]
-                if max(y_coords) - min(y_coords) > MIN_PERSON_HEIGHT_PROPORTION:
-                    person_detected = True
-                else:
-                    general_errors.append("Aproxime-se da camera!")
-            else:
-                general_errors.append("Ninguem detectado. Posicione-se na camera.")
-
-            # Processa os landmarks se uma pessoa foi detectada
-            if person_detected:
-                try:
-                    landmarks = results.pose_landmarks.landmark
-                    current_exercise.process_landmarks(landmarks)
-                except Exception as e:
-                    print(f"ERRO AO PROCESSAR LANDMARKS: {e}")
-                    general_errors.append("Erro no processamento. Tente se reposicionar.")
+    profiler = FrameProfiler(enabled=bool(profile or profile_path), export_path=profile_path)
+
+    # A pose roda sobre um recorte reduzido do frame da câmera, e não na imagem da tela
+    if quality is not None:
+        estimator = RoiPoseEstimator(quality.pose, input_size=quality.input_size, profiler=profiler)
+    else:
+        estimator = RoiPoseEstimator(pose, profiler=profiler)
+
+    # Taxa de inferência adaptativa, com previsão dos landmarks entre inferências
+    scheduler = AdaptiveInferenceScheduler(target_fps) if target_fps else None
+    predictor = LandmarkPredictor()
+
+    recorder = LandmarkRecorder(record_path) if record_path else None
+    # O histórico só enfileira eventos; a thread do HistoryStore faz a escrita em disco
+    session_log = history.begin_session(user, exercise_name, level) if history is not None else None
+    session_started_at = time.perf_counter()
+
+    def infer(packet):
+        """Estágio de inferência: roda na thread de inferência, em ordem de frame."""
+        predicted = False
+        if scheduler is None or not predictor.ready or scheduler.should_infer(current_exercise.near_transition()):
+            started_at = time.perf_counter()
+            landmark_array = estimator.process(packet.frame)
+            finished_at = time.perf_counter()
+            if scheduler is not None:
+                scheduler.record_inference(finished_at - started_at)
+            # Em arquivos de vídeo os frames esperam na fila sem descarte: só o custo da pose conta
+            latency = finished_at - packet.captured_at if realtime else None
+            if quality is not None and quality.observe(finished_at - started_at, latency, finished_at):
+                # Novo nível de qualidade (o Pose já foi carregado em segundo plano): ele não tem
+                # o rastreamento atual
+                estimator.pose = quality.pose
+                estimator.input_size = quality.input_size
+                estimator.reset()
+            if landmark_array is not None:
+                predictor.update(landmark_array, packet.captured_at)
             else:
-                current_exercise.reset()
-
-            # --- DESENHA A NOVA INTERFACE NA TELA ---
-
-            # 1. Painel de Repetições (canto superior direito)
-            reps_text = str(current_exercise.reps)
-            (w_reps_label, h_reps_label), _ = cv2.getTextSize("REPS", cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
-            (w_reps_num, h_reps_num), _ = cv2.getTextSize(reps_text, cv2.FONT_HERSHEY_TRIPLEX, 2, 5)
-            
-            panel_w = 160
-            panel_h = 120
-            panel_x = DISPLAY_WIDTH - panel_w - 40
-            panel_y = 40
-            
-            draw_panel(image, panel_x, panel_y, panel_w, panel_h, NORD_NIGHT)
-            cv2.putText(image, "REPS", (panel_x + (panel_w - w_reps_label) // 2, panel_y + 40), cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_SNOW, 2, cv2.LINE_AA)
-            cv2.putText(image, reps_text, (panel_x + (panel_w - w_reps_num) // 2, panel_y + 100), cv2.FONT_HERSHEY_TRIPLEX, 2, NORD_FROST_GREEN, 5, cv2.LINE_AA)
-
-            # 2. Painel de Informações do Exercício (canto superior esquerdo)
-            info_text_1 = f"Exercicio: {exercise_name.replace('_', ' ').upper()}"
-            info_text_2 = f"Nivel: {level.upper()}"
-            draw_panel(image, 40, 40, 350, 120, NORD_NIGHT) # Painel com tamanho fixo
-            cv2.putText(image, info_text_1, (60, 80), cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_FROST_CYAN, 2, cv2.LINE_AA)
-            cv2.putText(image, info_text_2, (60, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, NORD_FROST_CYAN, 2, cv2.LINE_AA)
-
-            # 3. Painel de Feedback (centro inferior)
-            feedback = current_exercise.feedback
-            if feedback:
-                (w, h), _ = cv2.getTextSize(feedback, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
-                x_pos = (DISPLAY_WIDTH - w) // 2
-                y_pos = DISPLAY_HEIGHT - 80
-                draw_panel(image, x_pos - 20, y_pos - h - 10, w + 40, h + 30, NORD_NIGHT)
-                feedback_color = NORD_FROST_GREEN if "Boa" in feedback else NORD_SNOW
-                cv2.putText(image, feedback, (x_pos, y_pos), cv2.FONT_HERSHEY_SIMPLEX, 1, feedback_color, 2, cv2.LINE_AA)
-
-            # 4. Painel de Erros (canto inferior direito)
-            all_errors = general_errors + current_exercise.errors
-            if all_errors:
-                error_panel_h = len(all_errors) * 35 + 25
-                y_offset_errors = DISPLAY_HEIGHT - 40 - error_panel_h
-                draw_panel(image, DISPLAY_WIDTH - 440, y_offset_errors, 400, error_panel_h, NORD_NIGHT)
-                for i, error in enumerate(all_errors):
-                    cv2.putText(image, f"- {error}", (DISPLAY_WIDTH - 420, y_offset_errors + 30 + i * 35), cv2.FONT_HERSHEY_SIMPLEX, 0.7, NORD_AURORA_RED, 2, cv2.LINE_AA)
-
-            # Desenha os landmarks da pose por cima de tudo
-            if results.pose_landmarks and person_detected:
-                mp_drawing.draw_landmarks(
-                    image, results.pose_landmarks, mp_pose.POSE_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(245, 117, 66), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(245, 66, 230), thickness=2, circle_radius=2)
-                )
-
-            cv2.imshow('FitVision - Pressione Q para Voltar ao Menu', image)
-
-            if cv2.waitKey(10) & 0xFF == ord('q'):
-                break
-
-    cap.release()
-    cv2.destroyAllWindows()
-    print("Sessão encerrada. Retornando ao menu.")
+                predictor.reset()
+        else:
+            started = profiler.now()
+            landmark_array = predictor.predict(packet.captured_at)
+            profiler.record("predict", started)
+            predicted = True
+
+        if recorder is not None:
+            recorder.write(packet.captured_at - session_started_at, landmark_array, predicted)
+
+        started = profiler.now()
+        _, person_detected, general_errors = analyze_pose(current_exercise, landmark_array, packet.captured_at)
+        profiler.record("exercise", started)
+
+        # Copia o estado do exercício: a renderização roda em outra thread
+        packet.landmarks = landmark_array.copy() if landmark_array is not None else None
+        packet.person_detected = person_detected
+        packet.general_errors = general_errors
+        packet.reps = current_exercise.reps
+        packet.feedback = current_exercise.feedback
+        packet.errors = list(current_exercise.errors)
+        for event in current_exercise.pop_rep_events():
+            print(
+                f"Repetição {event['rep']}: {event['duration']:.2f} s (excêntrica {event['eccentric_time']:.2f} s, "
+                f"concêntrica {event['concentric_time']:.2f} s), amplitude {event['range_of_motion']:.0f} graus"
+            )
+            if session_log is not None:
+                session_log.rep(event, packet.captured_at - session_started_at)
+        if session_log is not None:
+            session_log.errors(general_errors + packet.errors, packet.captured_at - session_started_at)
+
+    hud = HudCompositor(exercise_name, level, DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    display_prep = MirroredResize(DISPLAY_WIDTH, DISPLAY_HEIGHT)
+    debug_overlay = StageStatsOverlay()
+    show_debug = [False]
+
+    def render(packet):
+        """Estágio de renderização: prepara a imagem da tela, desenha a interface e exibe."""
+        # Espelha e redimensiona o frame para exibição, no buffer de tela reaproveitado
+        started = profiler.now()
+        image = display_prep(packet.frame)
+        started = profiler.record("display_prep", started)
+
+        # --- DESENHA A NOVA INTERFACE NA TELA ---
+        hud.draw(image, packet.reps, packet.feedback, packet.general_errors + packet.errors)
+
+        # Desenha os landmarks da pose por cima de tudo
+        if packet.landmarks is not None and packet.person_detected:
+            draw_pose_landmarks(image, packet.landmarks, POSE_CONNECTIONS)
+
+        if show_debug[0]:
+            debug_overlay.draw(image, profiler)
+        started = profiler.record("overlay", started)
+        profiler.maybe_export()
+
+        if not display:
+            return True
+
+        cv2.imshow('FitVision - Pressione Q para Voltar ao Menu', image)
+        key = cv2.waitKey(1) & 0xFF
+        profiler.record("imshow", started)
+        if key == ord('d'):
+            # Liga a instrumentação junto com o painel, se ela não estava ligada
+            show_debug[0] = not show_debug[0]
+            profiler.enabled = show_debug[0] or bool(profile or profile_path)
+        return key != ord('q')
+
+    session_pipeline = SessionPipeline(cap, infer, render, realtime=realtime, profiler=profiler)
+    try:
+        stats = session_pipeline.run()
+    finally:
+        if recorder is not None:
+            recorder.close()
+    # O contador do exercício volta a zero quando a pessoa sai do quadro (por exemplo, para
+    # apertar Q); o total da sessão vem dos acumuladores do RepAnalytics, que sobrevivem ao reset
+    stats["rep_analytics"] = current_exercise.analytics.summary()
+    stats["reps"] = stats["rep_analytics"]["reps"]
+    if profiler.enabled:
+        stats["stages"] = profiler.summary()
+    if scheduler is not None:
+        stats["scheduler"] = scheduler.stats()
+    if session_log is not None:
+        session_log.end(stats)
+        stats["session_id"] = session_log.session_id
+    if quality is not None:
+        stats["quality"] = quality.stats()
+        # O nível em que a sessão terminou é o ponto de partida da próxima
+        quality.save()
+    stats["time_to_first_frame_ms"] = (
+        (session_pipeline.first_frame_at - requested_at) * 1000.0 if session_pipeline.first_frame_at else None
+    )
+    print(
+        f"Sessão encerrada ({stats['frames_rendered']} frames, {stats['fps']:.1f} FPS, "
+        f"latência média {stats['latency_ms_mean']:.1f} ms, p95 {stats['latency_ms_p95']:.1f} ms). "
+        "Retornando ao menu."
+    )
+    return stats